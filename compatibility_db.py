@@ -3,33 +3,54 @@ Compatibility Database for RimModManager
 Downloads and parses RimSort Community Rules Database.
 """
 
+import os
 import json
+import mmap
+import atexit
 import logging
 import time
 import urllib.request
 import urllib.error
+from sys import intern
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
 
+from json_backend import orjson, loads as _loads, dumps as _dumps
+
 log = logging.getLogger("rimmodmanager.compatibility_db")
 
+# Lower-cased package IDs shared by the parser and the order checks, so the
+# same few hundred IDs are not re-normalized on every validation pass.
+_lower_cache: dict[str, str] = {}
+
+
+def _lc(package_id: str) -> str:
+    """Return the interned lower-case form of a package ID."""
+    try:
+        return _lower_cache[package_id]
+    except KeyError:
+        lowered = _lower_cache[package_id] = intern(package_id.lower())
+        return lowered
+
+
 # RimSort Community Rules Database URL
 COMMUNITY_RULES_URL = "https://raw.githubusercontent.com/RimSort/Community-Rules-Database/main/communityRules.json"
 
 # Cache settings
 CACHE_EXPIRY_HOURS = 24
+CACHE_FLUSH_INTERVAL = 5  # Minimum seconds between cache rewrites
 
 
 @dataclass
 class ModRule:
     """Sorting rules for a single mod."""
     package_id: str
-    load_before: list[str] = field(default_factory=list)
-    load_after: list[str] = field(default_factory=list)
+    load_before: frozenset[str] = field(default_factory=frozenset)
+    load_after: frozenset[str] = field(default_factory=frozenset)
     load_bottom: bool = False
     load_top: bool = False
-    incompatible_with: list[str] = field(default_factory=list)
+    incompatible_with: frozenset[str] = field(default_factory=frozenset)
 
 
 @dataclass
@@ -39,6 +60,8 @@ class CommunityRulesDB:
     rules: dict[str, ModRule] = field(default_factory=dict)
     last_updated: float = 0
     source_url: str = ""
+    etag: str = ""
+    last_modified: str = ""
 
 
 class CompatibilityDatabase:
@@ -53,8 +76,15 @@ class CompatibilityDatabase:
         self.meta_file = cache_dir / "communityRules_meta.json"
         self._db: Optional[CommunityRulesDB] = None
         
+        # Serialized (data, meta) waiting to be written; see _save_cache
+        self._pending_cache: Optional[tuple[bytes, bytes]] = None
+        self._last_flush: Optional[float] = None
+        
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Make sure deferred cache writes are not lost on exit
+        atexit.register(self._flush)
     
     @property
     def is_loaded(self) -> bool:
@@ -77,8 +107,7 @@ class CompatibilityDatabase:
             return False
         
         try:
-            with open(self.meta_file, 'r') as f:
-                meta = json.load(f)
+            meta = _loads(self.meta_file.read_bytes())
             
             last_updated = meta.get("last_updated", 0)
             expiry = CACHE_EXPIRY_HOURS * 3600
@@ -93,8 +122,7 @@ class CompatibilityDatabase:
             return False
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load_json_file(self.cache_file)
             
             # Validate basic structure
             if not isinstance(data, dict) or 'rules' not in data:
@@ -107,10 +135,11 @@ class CompatibilityDatabase:
             # Load metadata
             if self.meta_file.exists():
                 try:
-                    with open(self.meta_file, 'r') as f:
-                        meta = json.load(f)
+                    meta = _loads(self.meta_file.read_bytes())
                     self._db.last_updated = meta.get("last_updated", 0)
                     self._db.source_url = meta.get("source_url", "")
+                    self._db.etag = meta.get("etag", "")
+                    self._db.last_modified = meta.get("last_modified", "")
                 except (json.JSONDecodeError, IOError):
                     log.warning("Cache metadata corrupted, using defaults")
                     self._db.last_updated = 0
@@ -119,12 +148,30 @@ class CompatibilityDatabase:
             log.info(f"Loaded {self.rule_count} rules from cache")
             return True
             
-        except (json.JSONDecodeError, IOError) as e:
+        except (json.JSONDecodeError, IOError, TypeError, AttributeError, ValueError) as e:
+            # Valid JSON with the wrong shape inside the rules fails in _parse_rules
             log.error(f"Failed to load cache: {e}")
             # Try to remove corrupted cache
             self._remove_cache()
             return False
     
+    @staticmethod
+    def _load_json_file(path: Path):
+        """
+        Parse a JSON file.
+        
+        With orjson the file is memory-mapped and parsed in place, avoiding
+        a copy of the whole multi-MB file into a bytes object first.
+        """
+        if orjson is None:
+            return _loads(path.read_bytes())
+        
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return orjson.loads(b"")  # mmap cannot map empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    
     def _remove_cache(self) -> None:
         """Remove corrupted cache files."""
         for f in [self.cache_file, self.meta_file]:
@@ -133,6 +180,36 @@ class CompatibilityDatabase:
                     f.unlink()
             except OSError:
                 pass
+    
+    def _cache_validators(self) -> dict[str, str]:
+        """Build conditional request headers from the cached metadata."""
+        if not self.cache_file.exists() or not self.meta_file.exists():
+            return {}
+        
+        try:
+            meta = _loads(self.meta_file.read_bytes())
+        except (json.JSONDecodeError, IOError):
+            return {}
+        
+        headers = {}
+        if meta.get("etag"):
+            headers['If-None-Match'] = meta["etag"]
+        if meta.get("last_modified"):
+            headers['If-Modified-Since'] = meta["last_modified"]
+        return headers
+    
+    def _reuse_cache(self) -> bool:
+        """Keep the cached rules after a 304 response and mark them fresh."""
+        if self._db is None and not self.load_from_cache():
+            return False
+        
+        self._db.last_updated = time.time()
+        try:
+            meta = self._build_meta(self.rule_count, self._db.etag, self._db.last_modified)
+            self._write_atomic(self.meta_file, _dumps(meta))
+        except OSError as e:
+            log.warning(f"Failed to update cache metadata: {e}")
+        return True
 
     def download(self, timeout: int = 30) -> bool:
         """
@@ -149,6 +226,9 @@ class CompatibilityDatabase:
         max_retries = 2
         last_error = None
         
+        # Skip the transfer entirely when upstream has not changed
+        validators = self._cache_validators()
+        
         for attempt in range(1, max_retries + 1):
             try:
                 req = urllib.request.Request(
@@ -156,19 +236,33 @@ class CompatibilityDatabase:
                     headers={
                         'User-Agent': 'RimModManager/2.0',
                         'Accept': 'application/json',
+                        **validators,
                     }
                 )
                 
                 with urllib.request.urlopen(req, timeout=timeout) as response:
-                    data = json.loads(response.read().decode('utf-8'))
+                    body = response.read()
+                    etag = response.headers.get('ETag', '')
+                    last_modified = response.headers.get('Last-Modified', '')
+                
+                data = _loads(body)
+                if not isinstance(data, dict) or 'rules' not in data:
+                    raise ValueError("unexpected rules file structure")
                 
-                # Parse and store
-                self._db = self._parse_rules(data)
-                self._db.last_updated = time.time()
-                self._db.source_url = COMMUNITY_RULES_URL
+                db = self._parse_rules(data)
+                
+                # Cache the downloaded bytes as-is, but only once they have
+                # parsed; a payload that fails here must not replace the cache.
+                self._save_cache(
+                    body, rule_count=len(db.rules), etag=etag, last_modified=last_modified,
+                )
                 
-                # Save to cache
-                self._save_cache(data)
+                # Store
+                db.last_updated = time.time()
+                db.source_url = COMMUNITY_RULES_URL
+                db.etag = etag
+                db.last_modified = last_modified
+                self._db = db
                 
                 log.info(f"Downloaded {self.rule_count} rules")
                 return True
@@ -177,6 +271,12 @@ class CompatibilityDatabase:
                 last_error = f"Invalid JSON: {e}"
                 log.error(f"Attempt {attempt} failed: {last_error}")
             except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    if self._reuse_cache():
+                        log.info(f"Community rules unchanged, using {self.rule_count} cached rules")
+                        return True
+                    # Cached copy is unusable, fetch the full file instead
+                    validators = {}
                 last_error = f"HTTP error: {e.code}"
                 log.error(f"Attempt {attempt} failed: {last_error}")
             except urllib.error.URLError as e:
@@ -192,23 +292,54 @@ class CompatibilityDatabase:
         log.error(f"Failed to download rules after {max_retries} attempts: {last_error}")
         return False
     
-    def _save_cache(self, data: dict) -> None:
-        """Save database to cache files."""
+    def _save_cache(self, raw_bytes: bytes, rule_count: int = 0,
+                    etag: str = "", last_modified: str = "") -> None:
+        """
+        Queue the raw rules JSON for writing to the cache files.
+        
+        Writes are throttled to one per CACHE_FLUSH_INTERVAL; anything
+        queued in between is written by the next save or on exit.
+        Metadata is passed in rather than read from self._db, which may
+        still be being parsed when this runs.
+        """
+        meta = self._build_meta(rule_count, etag, last_modified)
+        self._pending_cache = (raw_bytes, _dumps(meta))
+        
+        now = time.monotonic()
+        if self._last_flush is None or now - self._last_flush >= CACHE_FLUSH_INTERVAL:
+            self._flush()
+    
+    @staticmethod
+    def _build_meta(rule_count: int, etag: str, last_modified: str) -> dict:
+        """Build the metadata stored next to the cached rules."""
+        return {
+            "last_updated": time.time(),
+            "source_url": COMMUNITY_RULES_URL,
+            "rule_count": rule_count,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+    
+    @staticmethod
+    def _write_atomic(path: Path, payload: bytes) -> None:
+        """Write payload to a temp file and rename it over path."""
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+    
+    def _flush(self) -> None:
+        """Write pending cache data to disk atomically."""
+        pending = self._pending_cache
+        if pending is None:
+            return
+        self._pending_cache = None
+        
+        data, meta = pending
         try:
-            # Save raw data
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f)
-            
-            # Save metadata
-            meta = {
-                "last_updated": time.time(),
-                "source_url": COMMUNITY_RULES_URL,
-                "rule_count": self.rule_count,
-            }
-            with open(self.meta_file, 'w') as f:
-                json.dump(meta, f)
-                
-        except IOError as e:
+            self._write_atomic(self.cache_file, data)
+            self._write_atomic(self.meta_file, meta)
+            self._last_flush = time.monotonic()
+        except OSError as e:
             log.warning(f"Failed to save cache: {e}")
     
     def _parse_rules(self, data: dict) -> CommunityRulesDB:
@@ -219,34 +350,35 @@ class CompatibilityDatabase:
         rules_data = data.get("rules", {})
         
         for package_id, rule_data in rules_data.items():
-            rule = ModRule(package_id=package_id.lower())
-            
-            # Parse loadBefore
-            load_before = rule_data.get("loadBefore", {})
-            for target_id in load_before.keys():
-                rule.load_before.append(target_id.lower())
+            pid_l = _lc(package_id)
             
-            # Parse loadAfter
-            load_after = rule_data.get("loadAfter", {})
-            for target_id in load_after.keys():
-                rule.load_after.append(target_id.lower())
+            # Interned IDs share one string object across rules, which keeps
+            # memory down and speeds up later dict lookups.
+            rule = ModRule(
+                package_id=pid_l,
+                load_before=frozenset(map(_lc, rule_data.get("loadBefore", {}))),
+                load_after=frozenset(map(_lc, rule_data.get("loadAfter", {}))),
+                incompatible_with=frozenset(map(_lc, rule_data.get("incompatibleWith", {}))),
+            )
             
-            # Parse loadBottom
-            load_bottom = rule_data.get("loadBottom", {})
-            if isinstance(load_bottom, dict) and load_bottom.get("value"):
-                rule.load_bottom = True
-            
-            # Parse loadTop
-            load_top = rule_data.get("loadTop", {})
-            if isinstance(load_top, dict) and load_top.get("value"):
-                rule.load_top = True
+            # Parse loadBottom / loadTop ({"value": true}). Most rules have
+            # neither, so check presence first (a raised KeyError costs more
+            # than a .get) and treat a malformed entry as unset.
+            load_bottom = rule_data.get("loadBottom")
+            if load_bottom is not None:
+                try:
+                    rule.load_bottom = bool(load_bottom["value"])
+                except (KeyError, TypeError):
+                    pass
             
-            # Parse incompatibleWith
-            incompatible = rule_data.get("incompatibleWith", {})
-            for target_id in incompatible.keys():
-                rule.incompatible_with.append(target_id.lower())
+            load_top = rule_data.get("loadTop")
+            if load_top is not None:
+                try:
+                    rule.load_top = bool(load_top["value"])
+                except (KeyError, TypeError):
+                    pass
             
-            db.rules[package_id.lower()] = rule
+            db.rules[pid_l] = rule
         
         return db
     
@@ -254,7 +386,7 @@ class CompatibilityDatabase:
         """Get sorting rule for a mod."""
         if not self._db:
             return None
-        return self._db.rules.get(package_id.lower())
+        return self._db.rules.get(_lc(package_id))
     
     def get_load_order_issues(self, mod_order: list[str]) -> list[dict]:
         """
@@ -270,49 +402,50 @@ class CompatibilityDatabase:
             return []
         
         issues = []
-        mod_positions = {pid.lower(): i for i, pid in enumerate(mod_order)}
+        lowered = [_lc(pid) for pid in mod_order]
+        mod_positions = {pid: i for i, pid in enumerate(lowered)}
+        present = set(mod_positions)
         
-        for i, package_id in enumerate(mod_order):
-            pid_lower = package_id.lower()
+        # Rule targets are frozensets, so each check only walks the (usually
+        # empty) intersection with the mods that are actually present.
+        for i, pid_lower in enumerate(lowered):
+            package_id = mod_order[i]
             rule = self._db.rules.get(pid_lower)
             
             if not rule:
                 continue
             
             # Check loadBefore violations
-            for should_be_after in rule.load_before:
-                if should_be_after in mod_positions:
-                    if mod_positions[should_be_after] < i:
-                        issues.append({
-                            "type": "load_order",
-                            "mod": package_id,
-                            "target": should_be_after,
-                            "message": f"'{package_id}' should load BEFORE '{should_be_after}'",
-                            "severity": "warning",
-                        })
+            for should_be_after in sorted(rule.load_before & present):
+                if mod_positions[should_be_after] < i:
+                    issues.append({
+                        "type": "load_order",
+                        "mod": package_id,
+                        "target": should_be_after,
+                        "message": f"'{package_id}' should load BEFORE '{should_be_after}'",
+                        "severity": "warning",
+                    })
             
             # Check loadAfter violations
-            for should_be_before in rule.load_after:
-                if should_be_before in mod_positions:
-                    if mod_positions[should_be_before] > i:
-                        issues.append({
-                            "type": "load_order",
-                            "mod": package_id,
-                            "target": should_be_before,
-                            "message": f"'{package_id}' should load AFTER '{should_be_before}'",
-                            "severity": "warning",
-                        })
-            
-            # Check incompatibilities
-            for incompat in rule.incompatible_with:
-                if incompat in mod_positions:
+            for should_be_before in sorted(rule.load_after & present):
+                if mod_positions[should_be_before] > i:
                     issues.append({
-                        "type": "incompatible",
+                        "type": "load_order",
                         "mod": package_id,
-                        "target": incompat,
-                        "message": f"'{package_id}' is INCOMPATIBLE with '{incompat}'",
-                        "severity": "error",
+                        "target": should_be_before,
+                        "message": f"'{package_id}' should load AFTER '{should_be_before}'",
+                        "severity": "warning",
                     })
+            
+            # Check incompatibilities
+            for incompat in sorted(rule.incompatible_with & present):
+                issues.append({
+                    "type": "incompatible",
+                    "mod": package_id,
+                    "target": incompat,
+                    "message": f"'{package_id}' is INCOMPATIBLE with '{incompat}'",
+                    "severity": "error",
+                })
         
         return issues
     
@@ -332,30 +465,13 @@ class CompatibilityDatabase:
         
         from collections import deque
         
-        mods_lower = [m.lower() for m in mods]
-        mod_set = set(mods_lower)
+        rules = self._db.rules
+        mods_lower = [_lc(m) for m in mods]
         
-        # Build dependency graph
-        # edges[a] = [b, c] means a should come before b and c
-        edges: dict[str, list[str]] = {m: [] for m in mods_lower}
-        in_degree: dict[str, int] = {m: 0 for m in mods_lower}
-        
-        for mod in mods_lower:
-            rule = self._db.rules.get(mod)
-            if not rule:
-                continue
-            
-            # loadBefore: this mod should come before targets
-            for target in rule.load_before:
-                if target in mod_set:
-                    edges[mod].append(target)
-                    in_degree[target] += 1
-            
-            # loadAfter: targets should come before this mod
-            for target in rule.load_after:
-                if target in mod_set:
-                    edges[target].append(mod)
-                    in_degree[mod] += 1
+        # Nothing to reorder when none of the mods have community rules
+        relevant = {m for m in mods_lower if m in rules}
+        if not relevant:
+            return list(mods)
         
         # Separate loadTop and loadBottom mods
         top_mods = []
@@ -363,7 +479,7 @@ class CompatibilityDatabase:
         middle_mods = []
         
         for mod in mods_lower:
-            rule = self._db.rules.get(mod)
+            rule = rules.get(mod)
             if rule and rule.load_top:
                 top_mods.append(mod)
             elif rule and rule.load_bottom:
@@ -371,29 +487,59 @@ class CompatibilityDatabase:
             else:
                 middle_mods.append(mod)
         
+        middle_set = set(middle_mods)
+        
+        # Build dependency graph between middle mods only; top and bottom
+        # mods are placed as blocks, so their edges never matter. Nodes are
+        # list indices so the sort loop does no string hashing.
+        # edges[a] = [b, c] means a should come before b and c
+        index = {m: i for i, m in enumerate(middle_mods)}
+        edges: list[list[int]] = [[] for _ in middle_mods]
+        in_degree = [0] * len(middle_mods)
+        
+        for i, mod in enumerate(middle_mods):
+            if mod not in relevant:
+                continue
+            rule = rules[mod]
+            
+            # loadBefore: this mod should come before targets
+            # (sorted so the result does not depend on set iteration order)
+            for target in sorted(rule.load_before & middle_set):
+                j = index[target]
+                edges[i].append(j)
+                in_degree[j] += 1
+            
+            # loadAfter: targets should come before this mod
+            for target in sorted(rule.load_after & middle_set):
+                edges[index[target]].append(i)
+                in_degree[i] += 1
+        
         # Topological sort for middle mods
-        queue = deque([m for m in middle_mods if in_degree.get(m, 0) == 0])
-        sorted_middle = []
+        queue = deque([i for i, degree in enumerate(in_degree) if degree == 0])
+        order = []
         
         while queue:
-            mod = queue.popleft()
-            if mod in middle_mods:
-                sorted_middle.append(mod)
+            i = queue.popleft()
+            order.append(i)
             
-            for neighbor in edges.get(mod, []):
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0 and neighbor in middle_mods:
-                    queue.append(neighbor)
+            for j in edges[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    queue.append(j)
         
-        # Add any remaining mods (cycle handling)
-        remaining = [m for m in middle_mods if m not in sorted_middle]
-        sorted_middle.extend(remaining)
+        # Mods still waiting on a parent are in (or behind) a rule cycle;
+        # append them in input order rather than dropping them
+        if len(order) < len(middle_mods):
+            remaining = [i for i, degree in enumerate(in_degree) if degree > 0]
+            log.warning(f"Cycle detected among {len(remaining)} mods in community rules")
+            order.extend(remaining)
+        sorted_middle = [middle_mods[i] for i in order]
         
         # Combine: top + sorted_middle + bottom
         result = top_mods + sorted_middle + bottom_mods
         
         # Map back to original case
-        original_case = {m.lower(): m for m in mods}
+        original_case = dict(zip(mods_lower, mods))
         return [original_case.get(m, m) for m in result]
     
     def get_stats(self) -> dict:
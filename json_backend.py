@@ -0,0 +1,22 @@
+"""
+JSON backend for RimModManager
+Shared bytes-in/bytes-out JSON helpers, using orjson when it is installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to stdlib json
+    orjson = None
+
+# orjson parses and produces bytes directly and is several times faster
+# than stdlib json, so callers never need a separate UTF-8 encode/decode.
+if orjson is not None:
+    loads = orjson.loads
+    dumps = orjson.dumps
+else:
+    loads = json.loads
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
@@ -3,6 +3,7 @@ Mod Importer for RimModManager
 Import modlists from RimPy, RimSort, and other formats.
 """
 
+import re
 import json
 import logging
 import xml.etree.ElementTree as ET
@@ -12,6 +13,12 @@ from enum import Enum
 
 log = logging.getLogger("rimmodmanager.mod_importer")
 
+# Workshop ID inside a steamcommunity.com URL
+_WORKSHOP_URL_ID_RE = re.compile(r'id=(\d+)')
+
+# Number of non-comment lines inspected when sniffing text formats
+_DETECT_SAMPLE_LINES = 10
+
 
 class ImportFormat(Enum):
     """Supported import formats."""
@@ -108,21 +115,23 @@ class ModImporter:
             return ImportFormat.UNKNOWN
         
         if suffix in (".txt", ".list", ".rml"):
-            # Check content
+            # Check content, reading only as far as the sample needs
             try:
+                lines = []
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith(('#', '//')):
+                            lines.append(line)
+                            if len(lines) == _DETECT_SAMPLE_LINES:
+                                break
                 
-                lines = [
-                    line.strip() for line in content.split('\n')
-                    if line.strip() and not line.strip().startswith('#') and not line.strip().startswith('//')
-                ]
                 if lines:
                     # All numeric = workshop IDs
-                    if all(line.isdigit() for line in lines[:10]):
+                    if all(line.isdigit() for line in lines):
                         return ImportFormat.WORKSHOP_IDS
                     # Contains dots = package IDs
-                    if any('.' in line for line in lines[:10]):
+                    if any('.' in line for line in lines):
                         return ImportFormat.PLAIN_TEXT
                         
             except IOError:
@@ -459,8 +468,7 @@ class ModImporter:
                 
                 # Extract workshop ID from URL if present
                 if "steamcommunity.com" in line:
-                    import re
-                    match = re.search(r'id=(\d+)', line)
+                    match = _WORKSHOP_URL_ID_RE.search(line)
                     if match:
                         workshop_ids.append(match.group(1))
                         continue
@@ -574,8 +582,7 @@ class ModImporter:
             
             # Workshop URL
             if "steamcommunity.com" in line:
-                import re
-                match = re.search(r'id=(\d+)', line)
+                match = _WORKSHOP_URL_ID_RE.search(line)
                 if match:
                     workshop_ids.append(match.group(1))
                 continue
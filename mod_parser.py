@@ -4,11 +4,15 @@ Parses About/About.xml files and manages mod metadata.
 Includes ModsConfig.xml parsing and profile management.
 """
 
+import os
 import re
+import stat
+import heapq
 import json
 import logging
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional
 from enum import Enum
@@ -16,9 +20,59 @@ from datetime import datetime
 
 from mod_categories import categorize_mod
 
+# Optional: lxml parses About.xml noticeably faster than ElementTree
+try:
+    from lxml import etree as _about_etree
+except ImportError:
+    _about_etree = None
+
+# Errors raised by whichever backend parses About.xml
+_ABOUT_PARSE_ERRORS = (ET.ParseError,) if _about_etree is None else (
+    ET.ParseError, _about_etree.ParseError,
+)
+
 # Module logger
 log = logging.getLogger("rimmodmanager.mod_parser")
 
+# Mods that must be at the top in this order: Harmony → Core → DLCs → Frameworks
+_CRITICAL_LOAD_ORDER = (
+    "brrainz.harmony",           # Harmony must be first
+    "ludeon.rimworld",           # Core
+    "ludeon.rimworld.royalty",   # DLCs
+    "ludeon.rimworld.ideology",
+    "ludeon.rimworld.biotech",
+    "ludeon.rimworld.anomaly",
+    "oskarpotocki.vanillaexpanded.framework",  # VEF
+    "unlimitedhugs.hugslib",     # HugsLib
+)
+_PRIORITY: dict[str, int] = {pid: rank for rank, pid in enumerate(_CRITICAL_LOAD_ORDER)}
+
+# ModInfo fields derived from About.xml, stored in the parse cache, with
+# the JSON types a cached value must have to be trusted
+_ABOUT_CACHE_FIELDS = {
+    "package_id": str, "name": str, "author": str, "description": str, "url": str,
+    "supported_versions": list, "mod_dependencies": list, "load_before": list,
+    "load_after": list, "incompatible_with": list, "is_valid": bool,
+    "error_message": str, "category": str, "category_confidence": (int, float),
+}
+
+# Bump whenever _parse_about_xml or mod_categories would produce different
+# results, so caches written by older versions are discarded
+_ABOUT_CACHE_VERSION = 1
+
+
+def _parse_about_content(content: str):
+    """Parse sanitized About.xml text, using lxml when it is installed."""
+    if _about_etree is None:
+        return ET.fromstring(content)
+    # lxml rejects str input that carries an encoding declaration, so feed
+    # UTF-8 bytes and force the encoding to match what we decoded with.
+    parser = _about_etree.XMLParser(
+        encoding="utf-8", resolve_entities=False, remove_comments=True,
+        remove_blank_text=True,
+    )
+    return _about_etree.fromstring(content.encode("utf-8"), parser)
+
 
 class ModSource(Enum):
     """Source of the mod."""
@@ -147,27 +201,53 @@ class ModParser:
         "ludeon.rimworld.anomaly": "Anomaly",
     }
     
-    def __init__(self):
+    # Folders to skip while scanning (not actual mods)
+    SKIP_FOLDERS = {
+        'about', 'assemblies', 'defs', 'languages', 'patches', 
+        'sounds', 'textures', 'source', 'news', '1.0', '1.1', 
+        '1.2', '1.3', '1.4', '1.5', 'common', 'v1.0', 'v1.1',
+        'v1.2', 'v1.3', 'v1.4', 'v1.5', 'loadfolders'
+    }
+    
+    # About.xml locations relative to a mod folder, in lookup order
+    ABOUT_XML_CANDIDATES = (
+        os.path.join("About", "About.xml"),
+        os.path.join("About", "about.xml"),
+        "about.xml",
+    )
+    
+    def __init__(self, cache_file: Optional[Path] = None):
         self.mods: dict[str, ModInfo] = {}  # package_id -> ModInfo
         self.mod_paths: dict[Path, ModInfo] = {}  # path -> ModInfo
-        self._cache_file = Path.home() / ".rimmodmanager_cache.json"
-        self._cache: dict[str, dict] = {}  # path_str -> {mtime, data}
+        self._cache_file = cache_file or Path.home() / ".rimmodmanager_cache.json"
+        self._cache: dict[str, dict] = {}  # about_xml_path -> {mtime_ns, size, data}
+        self._cache_dirty = False
         self._load_cache()
 
     def _load_cache(self):
-        """Load parsed mod cache from disk."""
+        """Load parsed mod cache from disk, ignoring it if written by another version."""
         if self._cache_file.exists():
             try:
                 with open(self._cache_file, 'r', encoding='utf-8') as f:
-                    self._cache = json.load(f)
+                    stored = json.load(f)
             except (json.JSONDecodeError, IOError):
+                stored = None
+            if (isinstance(stored, dict) and stored.get("version") == _ABOUT_CACHE_VERSION
+                    and isinstance(stored.get("entries"), dict)):
+                self._cache = stored["entries"]
+            else:
                 self._cache = {}
     
     def _save_cache(self):
-        """Save cache to disk."""
+        """Save cache to disk if anything changed since the last save."""
+        if not self._cache_dirty:
+            return
+        # Drop entries for mods removed from folders that are no longer scanned
+        self._cache = {k: v for k, v in self._cache.items() if os.path.isfile(k)}
         try:
             with open(self._cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f)
+                json.dump({"version": _ABOUT_CACHE_VERSION, "entries": self._cache}, f)
+            self._cache_dirty = False
         except IOError:
             pass
     
@@ -176,52 +256,51 @@ class ModParser:
         Parse a single mod folder and extract metadata.
         Returns ModInfo or None if invalid.
         """
-        if not mod_path.is_dir():
-            return None
-        
-        about_xml = mod_path / "About" / "About.xml"
-        about_xml_lower = mod_path / "About" / "about.xml"
+        mod = self._build_mod(mod_path)
+        if mod:
+            self._register_mod(mod)
+        return mod
+    
+    def _register_mod(self, mod: ModInfo) -> None:
+        """Store a parsed mod in the lookup tables."""
+        if mod.package_id:
+            self.mods[mod.package_id.lower()] = mod
+        self.mod_paths[mod.path] = mod
+    
+    def _build_mod(self, mod_path: Path, about_xml: Optional[Path] = None,
+                   about_stat: Optional[os.stat_result] = None) -> Optional[ModInfo]:
+        """
+        Build ModInfo for a mod folder without registering it.
+        Callers that already located About.xml pass it (and its stat) in
+        so the folder is not probed a second time.
+        """
+        if about_xml is None:
+            if not mod_path.is_dir():
+                return None
+            found = self._find_about_xml(str(mod_path))
+            if found:
+                about_xml, about_stat = Path(found[0]), found[1]
         
         # Create base mod info
-        mod = ModInfo(path=mod_path, about_xml_path=about_xml)
+        mod = ModInfo(path=mod_path, about_xml_path=about_xml or mod_path / "About" / "About.xml")
         
         # Check if this is a core mod (from Data folder)
         if mod_path.parent.name == "Data":
             mod.source = ModSource.GAME
         
         # Try to parse About.xml
-        if about_xml.exists():
+        if about_xml is not None:
             try:
-                mod.about_xml_path = about_xml
-                mod = self._parse_about_xml(mod, about_xml)
-            except (ET.ParseError, OSError, IOError, UnicodeDecodeError) as e:
+                mod = self._load_about_xml(mod, about_xml, about_stat)
+            except (*_ABOUT_PARSE_ERRORS, OSError, IOError, UnicodeDecodeError) as e:
                 mod.is_valid = False
                 mod.error_message = f"Failed to parse About.xml: {e}"
                 # Try to extract at least the name from folder
                 mod.name = mod_path.name
-        elif about_xml_lower.exists():
-            try:
-                mod.about_xml_path = about_xml_lower
-                mod = self._parse_about_xml(mod, about_xml_lower)
-            except (ET.ParseError, OSError, IOError, UnicodeDecodeError) as e:
-                mod.is_valid = False
-                mod.error_message = f"Failed to parse About.xml: {e}"
-                mod.name = mod_path.name
         else:
-            # Check for legacy About.xml location
-            legacy_xml = mod_path / "about.xml"
-            if legacy_xml.exists():
-                try:
-                    mod.about_xml_path = legacy_xml
-                    mod = self._parse_about_xml(mod, legacy_xml)
-                except (ET.ParseError, OSError, IOError, UnicodeDecodeError) as e:
-                    mod.is_valid = False
-                    mod.error_message = f"Failed to parse About.xml: {e}"
-                    mod.name = mod_path.name
-            else:
-                mod.is_valid = False
-                mod.error_message = "No About.xml found"
-                mod.name = mod_path.name
+            mod.is_valid = False
+            mod.error_message = "No About.xml found"
+            mod.name = mod_path.name
         
         # Check for Steam Workshop ID from folder name or PublishedFileId.txt
         self._detect_workshop_id(mod)
@@ -229,27 +308,67 @@ class ModParser:
         # Check for preview image
         mod.get_preview_image()
         
-        # Auto-detect category
-        self._detect_category(mod)
+        # Auto-detect category (already set when About.xml was loaded)
+        if not mod.category:
+            self._detect_category(mod)
         
-        # Store in cache
-        if mod.package_id:
-            self.mods[mod.package_id.lower()] = mod
-        self.mod_paths[mod_path] = mod
+        return mod
+    
+    def _load_about_xml(self, mod: ModInfo, xml_path: Path,
+                        st: Optional[os.stat_result] = None) -> ModInfo:
+        """
+        Populate mod info from About.xml.
+        Reuses the cached result when the file's mtime and size are unchanged.
+        """
+        if st is None:
+            st = os.stat(xml_path)
+        key = os.path.abspath(xml_path)
+        
+        entry = self._cache.get(key)
+        if (isinstance(entry, dict) and entry.get("mtime_ns") == st.st_mtime_ns
+                and entry.get("size") == st.st_size and self._valid_cache_data(entry.get("data"))):
+            data = entry["data"]
+            for name in _ABOUT_CACHE_FIELDS:
+                value = data[name]
+                setattr(mod, name, list(value) if isinstance(value, list) else value)
+            return mod
+        
+        mod = self._parse_about_xml(mod, xml_path)
+        self._detect_category(mod)
         
+        self._cache[key] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "data": {name: getattr(mod, name) for name in _ABOUT_CACHE_FIELDS},
+        }
+        self._cache_dirty = True
         return mod
     
+    @staticmethod
+    def _valid_cache_data(data) -> bool:
+        """Check that cached About.xml data has every field, each with the expected type."""
+        if not isinstance(data, dict):
+            return False
+        for name, expected in _ABOUT_CACHE_FIELDS.items():
+            value = data.get(name)
+            if not isinstance(value, expected):
+                return False
+            if expected is list and not all(isinstance(item, str) for item in value):
+                return False
+        return True
+    
     def _parse_about_xml(self, mod: ModInfo, xml_path: Path) -> ModInfo:
         """Parse the About.xml file and populate mod info."""
         try:
-            # Read file content and handle encoding issues
-            with open(xml_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
+            # Read the whole file in one unbuffered call, then decode
+            # leniently to handle encoding issues
+            with open(xml_path, 'rb', buffering=0) as f:
+                content = f.read().decode('utf-8', errors='replace')
             
             # Clean up common XML issues
             content = self._sanitize_xml(content)
             
-            root = ET.fromstring(content)
+            root = _parse_about_content(content)
             
             # Package ID (required for modern mods)
             package_id = self._get_text(root, "packageId")
@@ -300,7 +419,7 @@ class ModParser:
             
             mod.is_valid = True
             
-        except ET.ParseError as e:
+        except _ABOUT_PARSE_ERRORS as e:
             mod.is_valid = False
             mod.error_message = f"XML Parse Error: {e}"
             mod.name = mod.path.name
@@ -399,42 +518,42 @@ class ModParser:
         """
         mods = []
         
-        if not directory.exists() or not directory.is_dir():
+        if not directory.is_dir():
             return mods
         
-        # Folders to skip (not actual mods)
-        SKIP_FOLDERS = {
-            'about', 'assemblies', 'defs', 'languages', 'patches', 
-            'sounds', 'textures', 'source', 'news', '1.0', '1.1', 
-            '1.2', '1.3', '1.4', '1.5', 'common', 'v1.0', 'v1.1',
-            'v1.2', 'v1.3', 'v1.4', 'v1.5', 'loadfolders'
-        }
-        
+        seen = set()
         try:
-            for item in directory.iterdir():
-                if item.is_dir():
-                    # Skip hidden folders
-                    if item.name.startswith('.'):
-                        continue
-                    
-                    # Skip known non-mod folders
-                    if item.name.lower() in SKIP_FOLDERS:
-                        continue
-                    
-                    # Check if this looks like a valid mod (has About/About.xml)
-                    about_xml = item / "About" / "About.xml"
-                    about_xml_lower = item / "About" / "about.xml"
-                    legacy_xml = item / "about.xml"
-                    
-                    if not (about_xml.exists() or about_xml_lower.exists() or legacy_xml.exists()):
-                        # Not a valid mod folder, skip
-                        continue
-                    
-                    mod = self.parse_mod(item)
-                    if mod and mod.is_valid:
-                        if source != ModSource.LOCAL:
-                            mod.source = source
-                        mods.append(mod)
+            found = list(self._iter_mod_dirs(directory))
+            mod_paths = [Path(entry.path) for entry, _, _ in found]
+            about_paths = [Path(xml_path) for _, xml_path, _ in found]
+            about_stats = [st for _, _, st in found]
+            
+            # lxml releases the GIL while parsing, so threads help there;
+            # with ElementTree they would only add overhead.
+            if _about_etree is not None and len(mod_paths) > 1:
+                workers = min(os.cpu_count() or 1, len(mod_paths))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    parsed = list(pool.map(self._build_mod, mod_paths, about_paths, about_stats))
+            else:
+                parsed = [self._build_mod(*args) for args in zip(mod_paths, about_paths, about_stats)]
+            
+            # Register in folder order so duplicate IDs resolve as before
+            for mod in parsed:
+                if mod:
+                    self._register_mod(mod)
+                    seen.add(os.path.abspath(mod.about_xml_path))
+                if mod and mod.is_valid:
+                    if source != ModSource.LOCAL:
+                        mod.source = source
+                    mods.append(mod)
+            
+            # Drop cache entries for mods that are no longer in this folder
+            prefix = os.path.join(os.path.abspath(directory), "")
+            stale = [k for k in self._cache if k.startswith(prefix) and k not in seen]
+            for key in stale:
+                del self._cache[key]
+            if stale:
+                self._cache_dirty = True
             
             # Save cache after scanning
             self._save_cache()
@@ -444,6 +563,46 @@ class ModParser:
         
         return mods
     
+    def _find_about_xml(self, folder: str) -> Optional[tuple[str, os.stat_result]]:
+        """Return the first About.xml candidate in folder that is a file, with its stat."""
+        for candidate in self.ABOUT_XML_CANDIDATES:
+            path = os.path.join(folder, candidate)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                return path, st
+        return None
+    
+    def _iter_mod_dirs(self, directory: Path):
+        """
+        Yield (os.DirEntry, about_xml_path, about_xml_stat) for folders in
+        directory that contain an About.xml.
+        
+        Uses os.scandir so the directory check comes from the listing itself
+        rather than a separate stat per entry, and hands back the About.xml
+        stat so parsing does not look it up again.
+        """
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                # Skip hidden folders and known non-mod folders
+                if name.startswith('.') or name.lower() in self.SKIP_FOLDERS:
+                    continue
+                
+                # Symlinked mod folders are common, so follow them
+                try:
+                    if not entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                
+                # Check if this looks like a valid mod (has About/About.xml)
+                found = self._find_about_xml(entry.path)
+                if found:
+                    yield entry, found[0], found[1]
+    
     def scan_game_data(self, game_path: Path) -> list[ModInfo]:
         """Scan game's Data folder for core mods/DLCs."""
         data_path = game_path / "Data"
@@ -529,8 +688,6 @@ class ModParser:
         Uses topological sort with Kahn's algorithm.
         Also enforces critical load order: Harmony → Core → DLCs → Frameworks → Others
         """
-        from collections import deque
-        
         if not mods:
             return []
 
@@ -541,82 +698,67 @@ class ModParser:
         if not mods_with_id:
             return anonymous_mods
         
-        # Critical mods that must be at the top in specific order
-        CRITICAL_ORDER = [
-            "brrainz.harmony",           # Harmony must be first
-            "ludeon.rimworld",           # Core
-            "ludeon.rimworld.royalty",   # DLCs
-            "ludeon.rimworld.ideology",
-            "ludeon.rimworld.biotech",
-            "ludeon.rimworld.anomaly",
-            "oskarpotocki.vanillaexpanded.framework",  # VEF
-            "unlimitedhugs.hugslib",     # HugsLib
-        ]
-        
-        # Build mod dict
-        mod_dict = {m.package_id.lower(): m for m in mods_with_id}
-        
-        # Separate critical mods from others
-        critical_mods = []
-        other_mods = []
-        
-        for critical_id in CRITICAL_ORDER:
-            if critical_id in mod_dict:
-                critical_mods.append(mod_dict[critical_id])
-        
+        # Separate critical mods (see _CRITICAL_LOAD_ORDER) from others,
+        # lower-casing each package ID once
+        critical_dict = {}
+        other_dict = {}
         for mod in mods_with_id:
             mod_id = mod.package_id.lower()
-            if mod_id not in CRITICAL_ORDER:
-                other_mods.append(mod)
+            if mod_id in _PRIORITY:
+                critical_dict[mod_id] = mod
+            else:
+                other_dict[mod_id] = mod
+        
+        critical_mods = [critical_dict[pid] for pid in sorted(critical_dict, key=_PRIORITY.__getitem__)]
         
         # Sort other mods using topological sort
-        if not other_mods:
+        if not other_dict:
             return critical_mods + anonymous_mods
         
-        # Build dependency graph for non-critical mods
-        other_dict = {m.package_id.lower(): m for m in other_mods}
-        in_degree = {m.package_id.lower(): 0 for m in other_mods}
-        graph = {m.package_id.lower(): [] for m in other_mods}
+        # Build dependency graph for non-critical mods over integer node ids
+        node_ids = list(other_dict)
+        index = {mod_id: i for i, mod_id in enumerate(node_ids)}
+        n = len(node_ids)
+        in_degree = [0] * n
+        graph: list[list[int]] = [[] for _ in range(n)]
         
-        for mod in other_mods:
-            mod_id = mod.package_id.lower()
+        for mod_id, mod in other_dict.items():
+            i = index[mod_id]
             
             # loadAfter means this mod should come after those mods
             for after_id in mod.load_after:
-                after_id = after_id.lower()
-                if after_id in other_dict:
-                    graph[after_id].append(mod_id)
-                    in_degree[mod_id] += 1
+                j = index.get(after_id.lower())
+                if j is not None:
+                    graph[j].append(i)
+                    in_degree[i] += 1
             
             # loadBefore means this mod should come before those mods
             for before_id in mod.load_before:
-                before_id = before_id.lower()
-                if before_id in other_dict:
-                    graph[mod_id].append(before_id)
-                    in_degree[before_id] += 1
-        
-        # Kahn's algorithm
-        queue = deque(sorted([m for m in in_degree if in_degree[m] == 0]))
+                j = index.get(before_id.lower())
+                if j is not None:
+                    graph[i].append(j)
+                    in_degree[j] += 1
+        
+        # Kahn's algorithm; the heap always yields the alphabetically first
+        # ready mod, so unconstrained mods come out in package ID order.
+        ready = [(mod_id, i) for i, mod_id in enumerate(node_ids) if in_degree[i] == 0]
+        heapq.heapify(ready)
         sorted_others = []
         
-        while queue:
-            node = queue.popleft()
-            sorted_others.append(other_dict[node])
+        while ready:
+            _, i = heapq.heappop(ready)
+            sorted_others.append(other_dict[node_ids[i]])
             
-            new_nodes = []
-            for neighbor in graph[node]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    new_nodes.append(neighbor)
-            
-            if new_nodes:
-                new_nodes.sort()
-                queue.extend(new_nodes)
-        
-        # Handle cycles - add remaining mods
-        if len(sorted_others) != len(other_mods):
-            remaining = [m for m in other_mods if m not in sorted_others]
-            sorted_others.extend(remaining)
+            for j in graph[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    heapq.heappush(ready, (node_ids[j], j))
+        
+        # Handle cycles - add remaining mods in their original order
+        if len(sorted_others) != n:
+            sorted_others.extend(
+                other_dict[node_ids[i]] for i in range(n) if in_degree[i] > 0
+            )
         
         # Combine: critical mods first, then sorted others, then anonymous mods.
         return critical_mods + sorted_others + anonymous_mods
@@ -833,29 +975,31 @@ class ModsConfigParser:
         if not mods_config:
             return [], "", []
         
+        # Stream the file; only <version> and the <li> entries of <activeMods>
+        # and <knownExpansions> directly under the root are needed
+        game_version = ""
+        active_mods = []
+        known_expansions = []
+        lists = {"activeMods": active_mods, "knownExpansions": known_expansions}
+        path = []  # tags from the root down to the current element
+        
         try:
-            tree = ET.parse(mods_config)
-            root = tree.getroot()
-            
-            # Get game version
-            version_elem = root.find("version")
-            game_version = version_elem.text.strip() if version_elem is not None and version_elem.text else ""
-            
-            # Get active mods
-            active_mods = []
-            active_mods_elem = root.find("activeMods")
-            if active_mods_elem is not None:
-                for li in active_mods_elem.findall("li"):
-                    if li.text:
-                        active_mods.append(li.text.strip())
-            
-            # Get known expansions
-            known_expansions = []
-            known_expansions_elem = root.find("knownExpansions")
-            if known_expansions_elem is not None:
-                for li in known_expansions_elem.findall("li"):
-                    if li.text:
-                        known_expansions.append(li.text.strip())
+            with open(mods_config, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=("start", "end")):
+                    if event == "start":
+                        path.append(elem.tag)
+                        continue
+                    
+                    depth = len(path)
+                    if depth == 3 and elem.tag == "li" and path[1] in lists:
+                        if elem.text:
+                            lists[path[1]].append(elem.text.strip())
+                    elif depth == 2 and elem.tag == "version" and not game_version:
+                        game_version = elem.text.strip() if elem.text else ""
+                    
+                    path.pop()
+                    if depth > 1:
+                        elem.clear()
             
             return active_mods, game_version, known_expansions
             
@@ -869,9 +1013,8 @@ class ModsConfigParser:
         Write ModsConfig.xml - RimSort-style implementation.
         DLC/Core are NOT written to activeMods - they're loaded from game Data folder.
         """
-        import os
         import shutil
-        import xml.dom.minidom as minidom
+        from xml.sax.saxutils import escape
         
         # DLC package IDs - DO NOT filter these out
         # Game needs all active mods including DLC in activeMods
@@ -943,8 +1086,9 @@ class ModsConfigParser:
         other_mods = [m for m in filtered_mods if m not in TIER_ZERO and m != CORE_ID and m not in DLC_ORDER]
         
         # Check if Core/DLCs were in original list
-        has_core = CORE_ID in [m.lower() for m in active_mods]
-        active_dlcs = [dlc for dlc in DLC_ORDER if dlc in [m.lower() for m in active_mods]]
+        requested = {m.lower() for m in active_mods}
+        has_core = CORE_ID in requested
+        active_dlcs = [dlc for dlc in DLC_ORDER if dlc in requested]
         
         # Build final ordered list
         final_mods = []
@@ -964,56 +1108,23 @@ class ModsConfigParser:
             except (OSError, PermissionError, shutil.Error) as e:
                 log.warning(f"Failed to create ModsConfig backup: {e}")
         
-        # Build dict structure (RimSort style)
-        data = {
-            "ModsConfigData": {
-                "version": final_version,
-                "activeMods": {"li": final_mods},
-                "knownExpansions": {"li": KNOWN_EXPANSIONS}
-            }
-        }
-        
-        # Convert dict to XML
-        def dict_to_xml(d: dict, parent=None):
-            if parent is None:
-                tag = list(d.keys())[0]
-                root = ET.Element(tag)
-                dict_to_xml(d[tag], root)
-                return root
-            
-            for key, val in d.items():
-                if isinstance(val, dict):
-                    if "li" in val and isinstance(val["li"], list):
-                        elem = ET.SubElement(parent, key)
-                        for item in val["li"]:
-                            li = ET.SubElement(elem, "li")
-                            li.text = str(item)
-                    else:
-                        elem = ET.SubElement(parent, key)
-                        dict_to_xml(val, elem)
-                elif isinstance(val, list):
-                    for item in val:
-                        elem = ET.SubElement(parent, key)
-                        if isinstance(item, dict):
-                            dict_to_xml(item, elem)
-                        else:
-                            elem.text = str(item)
-                else:
-                    elem = ET.SubElement(parent, key)
-                    elem.text = str(val)
-            return parent
+        # The schema is fixed, so write the XML directly rather than
+        # building an ElementTree and pretty-printing it
+        def li_block(tag: str, items: list[str]) -> list[str]:
+            if not items:
+                return [f"  <{tag}/>"]
+            return [f"  <{tag}>", *(f"    <li>{escape(item)}</li>" for item in items), f"  </{tag}>"]
         
         try:
-            root = dict_to_xml(data)
-            
-            # Pretty print with minidom
-            rough = ET.tostring(root, encoding="utf-8")
-            reparsed = minidom.parseString(rough)
-            pretty_xml = reparsed.toprettyxml(indent="  ")
-            
-            # Remove extra blank lines
-            lines = [line for line in pretty_xml.split('\n') if line.strip()]
-            final_xml = '\n'.join(lines)
+            lines = [
+                '<?xml version="1.0" encoding="utf-8"?>',
+                "<ModsConfigData>",
+                f"  <version>{escape(final_version)}</version>",
+                *li_block("activeMods", final_mods),
+                *li_block("knownExpansions", KNOWN_EXPANSIONS),
+                "</ModsConfigData>",
+            ]
+            payload = "\n".join(lines).encode("utf-8")
             
             # Atomic write: write to temp file, then rename
             import tempfile
@@ -1024,11 +1135,12 @@ class ModsConfigParser:
                 dir=mods_config_path.parent
             )
             try:
-                with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                    f.write(final_xml)
+                # Write the whole pre-encoded document in one call
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
                 
                 # Atomic rename
-                Path(temp_path).replace(mods_config)
+                os.replace(temp_path, mods_config)
             except (IOError, OSError):
                 try:
                     os.unlink(temp_path)
@@ -1040,7 +1152,7 @@ class ModsConfigParser:
             
             return True
             
-        except (IOError, OSError, ET.ParseError, ValueError, TypeError) as e:
+        except (IOError, OSError, ValueError, TypeError) as e:
             log.error(f"ModsConfig write failed: {e}", exc_info=True)
             return False
 
@@ -1,21 +1,51 @@
 """
 Mod Presets for RimModManager
-Shareable modlist codes using base64+zlib compression.
+Shareable modlist codes using base64+zlib (or zstd) compression.
 """
 
 import json
 import zlib
 import base64
 import logging
+import functools
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
+from json_backend import loads as _loads, dumps as _dumps
+
+try:
+    import pybase64
+except ImportError:  # Optional dependency, fall back to stdlib base64
+    pybase64 = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, only needed for v2 codes
+    zstandard = None
+
 log = logging.getLogger("rimmodmanager.mod_presets")
 
-# Preset code format: RMM:v1:<base64_compressed_data>
+# URL-safe base64; pybase64 uses SIMD and returns str without a decode step
+if pybase64 is not None:
+    def _b64encode(data: bytes) -> str:
+        return pybase64.b64encode_as_string(data, altchars=b'-_')
+
+    _b64decode = pybase64.urlsafe_b64decode
+else:
+    def _b64encode(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    _b64decode = base64.urlsafe_b64decode
+
+# Preset code formats:
+#   RMM:v1:<base64_zlib_compressed_json>  - default, decodable everywhere
+#   RMM:v2:<base64_zstd_compressed_json>  - faster, needs zstandard installed
 PRESET_PREFIX = "RMM"
 PRESET_VERSION = 1
+PRESET_VERSION_ZSTD = 2
+
+_COMPRESSION_ERRORS = (zlib.error, zstandard.ZstdError) if zstandard else (zlib.error,)
 
 
 @dataclass
@@ -40,12 +70,15 @@ class PresetEncoder:
         workshop_ids: list[str] = None,
         description: str = "",
         author: str = "",
-        game_version: str = ""
+        game_version: str = "",
+        use_zstd: bool = False
     ) -> str:
         """
         Encode a modlist as a shareable code.
         
-        Format: RMM:v1:<base64_zlib_compressed_json>
+        Format: RMM:v1:<base64_zlib_compressed_json>, or
+        RMM:v2:<base64_zstd_compressed_json> when use_zstd is set and
+        zstandard is installed. Only v1 codes can be read by every install.
         """
         data = {
             "n": name,  # Short keys for smaller output
@@ -66,30 +99,35 @@ class PresetEncoder:
         
         try:
             # Convert to JSON
-            json_str = json.dumps(data, separators=(',', ':'))
+            json_bytes = _dumps(data)
             
-            # Compress with zlib
-            compressed = zlib.compress(json_str.encode('utf-8'), level=9)
+            # Compress with zstd if requested and available, else zlib
+            if use_zstd and zstandard is not None:
+                compressed = zstandard.ZstdCompressor(level=3).compress(json_bytes)
+                version = PRESET_VERSION_ZSTD
+            else:
+                compressed = zlib.compress(json_bytes, level=9)
+                version = PRESET_VERSION
             
             # Encode as base64 (URL-safe)
-            b64 = base64.urlsafe_b64encode(compressed).decode('ascii')
+            b64 = _b64encode(compressed)
             
             # Build final code
-            code = f"{PRESET_PREFIX}:v{PRESET_VERSION}:{b64}"
+            code = f"{PRESET_PREFIX}:v{version}:{b64}"
             
             log.info(f"Encoded preset with {len(package_ids)} mods, code length: {len(code)}")
             return code
             
-        except (TypeError, ValueError, UnicodeEncodeError, zlib.error) as e:
+        except (TypeError, ValueError, UnicodeEncodeError) + _COMPRESSION_ERRORS as e:
             log.error(f"Failed to encode preset: {e}")
             raise ValueError(f"Failed to encode preset: {e}")
     
     @staticmethod
-    def decode(code: str) -> Optional[PresetData]:
+    def _decode_raw(code: str) -> Optional[dict]:
         """
-        Decode a shareable code back to preset data.
+        Decode a shareable code into its raw preset dict.
         
-        Returns PresetData or None if invalid.
+        Returns the dict or None if invalid.
         """
         code = code.strip()
         
@@ -112,38 +150,28 @@ class PresetEncoder:
         
         try:
             ver_num = int(version[1:])
-            if ver_num > PRESET_VERSION:
-                log.warning(f"Preset version {ver_num} is newer than supported {PRESET_VERSION}")
+            if ver_num > PRESET_VERSION_ZSTD:
+                log.warning(f"Preset version {ver_num} is newer than supported {PRESET_VERSION_ZSTD}")
                 # Try to decode anyway
         except ValueError:
             log.warning(f"Invalid version number: {version}")
             return None
         
+        if ver_num == PRESET_VERSION_ZSTD and zstandard is None:
+            log.error("Preset uses zstd compression but the 'zstandard' package is not installed")
+            return None
+        
         try:
             # Decode base64
-            compressed = base64.urlsafe_b64decode(b64_data)
-            
-            # Decompress
-            json_str = zlib.decompress(compressed).decode('utf-8')
+            compressed = _b64decode(b64_data)
             
-            # Parse JSON
-            data = json.loads(json_str)
+            # Decompress and parse JSON
+            if ver_num == PRESET_VERSION_ZSTD:
+                data = _loads(zstandard.ZstdDecompressor().decompress(compressed))
+            else:
+                data = _loads(zlib.decompress(compressed))
             
-            # Build PresetData
-            preset = PresetData(
-                name=data.get("n", "Imported Preset"),
-                package_ids=data.get("p", []),
-                workshop_ids=data.get("w", []),
-                created_at=data.get("t", ""),
-                description=data.get("d", ""),
-                author=data.get("a", ""),
-                game_version=data.get("v", ""),
-            )
-            
-            log.info(f"Decoded preset '{preset.name}' with {len(preset.package_ids)} mods")
-            return preset
-            
-        except (base64.binascii.Error, zlib.error) as e:
+        except (base64.binascii.Error,) + _COMPRESSION_ERRORS as e:
             log.error(f"Failed to decode preset data: {e}")
             return None
         except json.JSONDecodeError as e:
@@ -152,6 +180,37 @@ class PresetEncoder:
         except (UnicodeDecodeError, TypeError, ValueError) as e:
             log.error(f"Unexpected error decoding preset: {e}")
             return None
+        
+        if not isinstance(data, dict):
+            log.error("Preset data is not a JSON object")
+            return None
+        
+        return data
+    
+    @staticmethod
+    def decode(code: str) -> Optional[PresetData]:
+        """
+        Decode a shareable code back to preset data.
+        
+        Returns PresetData or None if invalid.
+        """
+        data = _decode_cached(code.strip())
+        if data is None:
+            return None
+        
+        # Build PresetData (copy lists, the cached dict is shared)
+        preset = PresetData(
+            name=data.get("n", "Imported Preset"),
+            package_ids=list(data.get("p", [])),
+            workshop_ids=list(data.get("w", [])),
+            created_at=data.get("t", ""),
+            description=data.get("d", ""),
+            author=data.get("a", ""),
+            game_version=data.get("v", ""),
+        )
+        
+        log.info(f"Decoded preset '{preset.name}' with {len(preset.package_ids)} mods")
+        return preset
     
     @staticmethod
     def validate_code(code: str) -> tuple[bool, str]:
@@ -181,14 +240,15 @@ class PresetEncoder:
             return False, "Code data too short"
         
         # Try to decode
-        preset = PresetEncoder.decode(code)
-        if preset is None:
+        data = _decode_cached(code)
+        if data is None:
             return False, "Failed to decode preset data"
         
-        if not preset.package_ids and not preset.workshop_ids:
+        package_ids = data.get("p", [])
+        if not package_ids and not data.get("w"):
             return False, "Preset contains no mods"
         
-        return True, f"Valid preset: {len(preset.package_ids)} mods"
+        return True, f"Valid preset: {len(package_ids)} mods"
     
     @staticmethod
     def get_code_stats(code: str) -> dict:
@@ -208,6 +268,18 @@ class PresetEncoder:
         }
 
 
+@functools.lru_cache(maxsize=64)
+def _decode_cached(code: str) -> Optional[dict]:
+    """
+    Memoized PresetEncoder._decode_raw.
+    
+    The UI validates, previews and then imports the same code, so this
+    avoids repeating the base64+decompress+JSON work. The returned dict
+    is shared and must not be mutated.
+    """
+    return PresetEncoder._decode_raw(code)
+
+
 def create_preset_code(
     package_ids: list[str],
     name: str = "My Modlist",
@@ -66,6 +66,15 @@ class TestModImporter(unittest.TestCase):
         fmt = self.importer.detect_format(txt_file)
         self.assertEqual(fmt, ImportFormat.WORKSHOP_IDS)
     
+    def test_detect_format_samples_first_lines(self):
+        """Format detection should only look at the first ten entries."""
+        txt_file = self.temp_dir / "long_workshop.txt"
+        lines = [str(1000000 + i) for i in range(10)] + ["not.a.workshop.id"]
+        txt_file.write_text("\n".join(lines))
+
+        fmt = self.importer.detect_format(txt_file)
+        self.assertEqual(fmt, ImportFormat.WORKSHOP_IDS)
+    
     def test_detect_format_nonexistent(self):
         """Test format detection for non-existent file."""
         fake_file = self.temp_dir / "nonexistent.json"
@@ -20,8 +20,9 @@ class TestModParser(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures."""
-        self.parser = ModParser()
         self.temp_dir = Path(tempfile.mkdtemp())
+        # Keep the parse cache out of the real home directory
+        self.parser = ModParser(cache_file=self.temp_dir / "cache.json")
     
     def tearDown(self):
         """Clean up test fixtures."""
@@ -95,6 +96,122 @@ class TestModParser(unittest.TestCase):
         mods = self.parser.scan_directory(fake_path, ModSource.LOCAL)
         self.assertEqual(len(mods), 0)
 
+    def test_scan_skips_non_mod_entries(self):
+        """Test that scanning ignores files, hidden and non-mod folders."""
+        self._create_mock_mod("RealMod", "real.mod")
+        (self.temp_dir / "NoAbout").mkdir()
+        (self.temp_dir / ".hidden" / "About").mkdir(parents=True)
+        (self.temp_dir / ".hidden" / "About" / "About.xml").write_text("<ModMetaData/>")
+        (self.temp_dir / "notes.txt").write_text("not a mod")
+
+        mods = self.parser.scan_directory(self.temp_dir)
+
+        self.assertEqual([m.package_id for m in mods], ["real.mod"])
+
+    def test_scan_many_mods(self):
+        """Test that every mod in a larger folder is parsed and registered."""
+        for i in range(12):
+            self._create_mock_mod(f"Mod{i}", f"test.mod{i}", load_after=[f"test.mod{i - 1}"])
+
+        mods = self.parser.scan_directory(self.temp_dir)
+
+        self.assertEqual(len(mods), 12)
+        for i in range(12):
+            mod = self.parser.get_mod_by_id(f"test.mod{i}")
+            self.assertIsNotNone(mod)
+            self.assertEqual(mod.load_after, [f"test.mod{i - 1}"])
+
+    def test_scan_reuses_cached_about_xml(self):
+        """Test that unchanged About.xml files are not parsed again."""
+        from unittest import mock
+
+        cache_file = self.temp_dir / "cache.json"
+        mods_dir = self.temp_dir
+        mod_dir = self._create_mock_mod("CachedMod", "cached.mod", load_after=["other.mod"])
+
+        self.parser.scan_directory(mods_dir)
+        self.assertTrue(cache_file.exists())
+
+        fresh = ModParser(cache_file=cache_file)
+        with mock.patch.object(fresh, "_parse_about_xml") as parse:
+            mods = fresh.scan_directory(mods_dir)
+        parse.assert_not_called()
+        self.assertEqual(mods[0].package_id, "cached.mod")
+        self.assertEqual(mods[0].load_after, ["other.mod"])
+
+        # A changed file is parsed again
+        about = mod_dir / "About" / "About.xml"
+        about.write_text(about.read_text().replace("cached.mod", "changed.mod.id"))
+        mods = fresh.scan_directory(mods_dir)
+        self.assertEqual(mods[0].package_id, "changed.mod.id")
+
+    def test_cache_from_other_version_discarded(self):
+        """Test that a parse cache without the current version key is ignored."""
+        import json
+        import os
+
+        mod_dir = self._create_mock_mod("Versioned", "versioned.mod")
+        key = os.path.abspath(mod_dir / "About" / "About.xml")
+        cache_file = self.temp_dir / "cache.json"
+        cache_file.write_text(json.dumps({key: {"mtime_ns": 0, "size": 0, "data": {}}}))
+
+        parser = ModParser(cache_file=cache_file)
+        self.assertEqual(parser._cache, {})
+
+        parser.scan_directory(self.temp_dir)
+        stored = json.loads(cache_file.read_text())
+        self.assertIn("version", stored)
+        self.assertEqual(len(ModParser(cache_file=cache_file)._cache), 1)
+
+    def test_cache_entry_with_bad_types_reparsed(self):
+        """Test that a cache hit with wrongly typed fields falls back to parsing."""
+        import os
+
+        mod_dir = self._create_mock_mod("Typed", "typed.mod")
+        self.parser.scan_directory(self.temp_dir)
+        key = os.path.abspath(mod_dir / "About" / "About.xml")
+        self.parser._cache[key]["data"]["package_id"] = 42
+
+        mod = self.parser.parse_mod(mod_dir)
+        self.assertEqual(mod.package_id, "typed.mod")
+
+    def test_save_cache_prunes_missing_about_xml(self):
+        """Test that cache entries for deleted About.xml files are dropped on save."""
+        mods_dir = self.temp_dir / "Mods"
+        mods_dir.mkdir()
+        self._create_mock_mod("Mods/Kept", "kept.mod")
+        self.parser.scan_directory(mods_dir)
+
+        gone = str(self.temp_dir / "Elsewhere" / "About" / "About.xml")
+        self.parser._cache[gone] = {"mtime_ns": 0, "size": 0, "data": {}}
+        self.parser._cache_dirty = True
+        self.parser._save_cache()
+
+        reloaded = ModParser(cache_file=self.temp_dir / "cache.json")
+        self.assertNotIn(gone, reloaded._cache)
+        self.assertEqual(len(reloaded._cache), 1)
+
+    def test_rescan_sees_about_xml_added_later(self):
+        """Test that a folder gaining its About.xml after a scan is picked up."""
+        mods_dir = self.temp_dir / "Mods"
+        mods_dir.mkdir()
+        self._create_mock_mod("Mods/A", "a.mod")
+        (mods_dir / "B").mkdir()
+        mods = self.parser.scan_directory(mods_dir)
+        self.assertEqual([m.package_id for m in mods], ["a.mod"])
+
+        # Steam finishing a workshop folder: About/About.xml appears inside B,
+        # which leaves the mtime of Mods itself unchanged
+        self._create_mock_mod("Mods/B", "b.mod")
+        mods = self.parser.scan_directory(mods_dir)
+        self.assertEqual(sorted(m.package_id for m in mods), ["a.mod", "b.mod"])
+
+        # A PublishedFileId.txt added to an existing About folder
+        (mods_dir / "A" / "About" / "PublishedFileId.txt").write_text("123456", encoding='utf-8')
+        mods = self.parser.scan_directory(mods_dir)
+        mod_a = next(m for m in mods if m.package_id == "a.mod")
+        self.assertEqual(mod_a.steam_workshop_id, "123456")
+
     def test_parse_lowercase_about_xml(self):
         """Test parsing mods that use About/about.xml."""
         mod_dir = self.temp_dir / "LowercaseAbout"
@@ -116,6 +233,35 @@ class TestModParser(unittest.TestCase):
         self.assertEqual(mods[0].package_id, "lowercase.about.mod")
         self.assertTrue(mods[0].is_valid)
 
+    def test_parse_legacy_root_about_xml(self):
+        """Test that scan and parse_mod both find a legacy root about.xml."""
+        mod_dir = self.temp_dir / "LegacyMod"
+        mod_dir.mkdir()
+        (mod_dir / "about.xml").write_text(
+            "<ModMetaData><name>Legacy</name><packageId>legacy.mod</packageId></ModMetaData>",
+            encoding='utf-8'
+        )
+
+        mods = self.parser.scan_directory(self.temp_dir, ModSource.LOCAL)
+        mod = self.parser.parse_mod(mod_dir)
+
+        self.assertEqual([m.package_id for m in mods], ["legacy.mod"])
+        self.assertEqual(mod.package_id, "legacy.mod")
+        self.assertEqual(mod.about_xml_path, mod_dir / "about.xml")
+
+    def test_parse_malformed_about_xml(self):
+        """Malformed About.xml marks the mod invalid instead of raising."""
+        mod_dir = self.temp_dir / "Broken"
+        (mod_dir / "About").mkdir(parents=True)
+        (mod_dir / "About" / "About.xml").write_text(
+            "<ModMetaData><!-- note --><name>Broken</ModMetaData>", encoding='utf-8'
+        )
+
+        mod = self.parser.parse_mod(mod_dir)
+
+        self.assertFalse(mod.is_valid)
+        self.assertIn("XML Parse Error", mod.error_message)
+
     def test_detect_workshop_id_from_lowercase_publishedfile(self):
         """Test workshop ID detection from lowercase publishedfileid.txt."""
         mod_dir = self._create_mock_mod("WorkshopMod", "workshop.mod")
@@ -152,7 +298,11 @@ class TestLoadOrderSorting(unittest.TestCase):
     """Tests for load order sorting functionality."""
     
     def setUp(self):
-        self.parser = ModParser()
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.parser = ModParser(cache_file=self.temp_dir / "cache.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
     
     def _create_mod_info(self, name, package_id, load_after=None, load_before=None):
         """Create a ModInfo object for testing."""
@@ -217,6 +367,22 @@ class TestLoadOrderSorting(unittest.TestCase):
         dep_idx = next(i for i, m in enumerate(sorted_mods) if m.package_id == "dependent.mod")
         self.assertLess(base_idx, dep_idx)
 
+    def test_sort_ties_alphabetical_and_cycles_kept(self):
+        """Unconstrained mods sort by ID; mods in a cycle are still returned."""
+        mods = [
+            self._create_mod_info("C", "c.mod"),
+            self._create_mod_info("Z", "z.mod", load_before=["a.mod"]),
+            self._create_mod_info("A", "a.mod"),
+            self._create_mod_info("X", "x.mod", load_after=["y.mod"]),
+            self._create_mod_info("Y", "y.mod", load_after=["x.mod"]),
+        ]
+        sorted_mods = self.parser.sort_by_load_order(mods)
+
+        self.assertEqual(
+            [m.package_id for m in sorted_mods],
+            ["c.mod", "z.mod", "a.mod", "x.mod", "y.mod"],
+        )
+
     def test_sort_handles_empty_package_ids(self):
         """Sorting should not crash when some mods have empty package IDs."""
         mods = [
@@ -266,7 +432,18 @@ class TestModsConfigParser(unittest.TestCase):
         self.assertIn("<activeMods>", content)
         self.assertIn("<li>ludeon.rimworld</li>", content)
         self.assertIn("<li>test.mod</li>", content)
-    
+
+    def test_write_mods_config_roundtrip(self):
+        """Test that a written ModsConfig.xml parses back, with escaping and ordering."""
+        active_mods = ["test.mod", "odd&<id>", "ludeon.rimworld", "brrainz.harmony"]
+        self.parser.write_mods_config(self.temp_dir, active_mods, game_version="1.5 <dev>")
+
+        parsed, version, expansions = self.parser.parse_mods_config(self.temp_dir)
+
+        self.assertEqual(parsed, ["brrainz.harmony", "ludeon.rimworld", "test.mod", "odd&<id>"])
+        self.assertEqual(version, "1.5 <dev>")
+        self.assertIn("ludeon.rimworld.royalty", expansions)
+
     def test_parse_mods_config(self):
         """Test reading existing ModsConfig.xml."""
         config_content = '''<?xml version="1.0" encoding="utf-8"?>
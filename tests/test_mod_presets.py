@@ -55,6 +55,26 @@ class TestPresetEncoder(unittest.TestCase):
         self.assertEqual(preset.name, "Roundtrip Test")
         self.assertEqual(preset.description, "Test description")
     
+    def test_encode_decode_zstd_roundtrip(self):
+        """Test that zstd codes roundtrip, falling back to v1 without zstandard."""
+        import mod_presets
+        package_ids = ["brrainz.harmony", "ludeon.rimworld"]
+        code = PresetEncoder.encode(package_ids, name="Zstd", use_zstd=True)
+        
+        expected = "RMM:v2:" if mod_presets.zstandard else "RMM:v1:"
+        self.assertTrue(code.startswith(expected))
+        self.assertEqual(PresetEncoder.decode(code).package_ids, package_ids)
+    
+    def test_decode_results_are_independent(self):
+        """Test that repeated decodes don't share mutable state."""
+        code = PresetEncoder.encode(["mod.one", "mod.two"], name="Cached")
+        
+        first = PresetEncoder.decode(code)
+        first.package_ids.append("mod.extra")
+        second = PresetEncoder.decode(code)
+        
+        self.assertEqual(second.package_ids, ["mod.one", "mod.two"])
+    
     def test_decode_invalid_prefix(self):
         """Test decoding with invalid prefix."""
         preset = PresetEncoder.decode("INVALID:v1:abc123")
@@ -70,6 +90,16 @@ class TestPresetEncoder(unittest.TestCase):
         preset = PresetEncoder.decode("")
         self.assertIsNone(preset)
     
+    def test_decode_non_object_payload(self):
+        """Test decoding a code whose JSON payload is not an object."""
+        import base64
+        import zlib
+        b64 = base64.urlsafe_b64encode(zlib.compress(b'["mod.one"]')).decode('ascii')
+        
+        self.assertIsNone(PresetEncoder.decode(f"RMM:v1:{b64}"))
+        is_valid, _ = PresetEncoder.validate_code(f"RMM:v1:{b64}")
+        self.assertFalse(is_valid)
+    
     def test_validate_code_valid(self):
         """Test validation of valid code."""
         code = PresetEncoder.encode(["mod.test"], name="Valid")
@@ -116,6 +116,177 @@ class TestCompatibilityDBCacheCorruption(unittest.TestCase):
             self.assertTrue(result)
             self.assertEqual(db._db.last_updated, 0)
             self.assertEqual(db._db.source_url, "")
+    
+    def test_saved_cache_roundtrip(self):
+        """Should reload rules written by _save_cache."""
+        from compatibility_db import CompatibilityDatabase
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            db._save_cache(json.dumps({
+                "timestamp": 1234,
+                "rules": {"Test.Mod": {"loadAfter": {"brrainz.harmony": {}}}},
+            }).encode())
+            
+            fresh = CompatibilityDatabase(Path(tmpdir))
+            self.assertTrue(fresh.load_from_cache())
+            self.assertTrue(fresh.is_cache_valid())
+            rule = fresh.get_rule("test.mod")
+            self.assertIsNotNone(rule)
+            self.assertIn("brrainz.harmony", rule.load_after)
+    
+    def test_repeated_saves_are_deferred(self):
+        """Saves within the flush interval should be written on flush."""
+        from compatibility_db import CompatibilityDatabase
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            db._save_cache(json.dumps({"timestamp": 1, "rules": {}}).encode())
+            db._save_cache(json.dumps({"timestamp": 2, "rules": {}}).encode())
+            self.assertEqual(json.loads(db.cache_file.read_text())["timestamp"], 1)
+            
+            db._flush()
+            self.assertEqual(json.loads(db.cache_file.read_text())["timestamp"], 2)
+            self.assertFalse(db.cache_file.with_name(db.cache_file.name + ".tmp").exists())
+    
+    def test_download_caches_response_bytes(self):
+        """A fresh download should be cached byte-for-byte with its ETag."""
+        from unittest import mock
+        from compatibility_db import CompatibilityDatabase
+        
+        body = b'{"timestamp": 7, "rules": {"Fresh.Mod": {"loadTop": {"value": true}}}}'
+        response = mock.MagicMock()
+        response.read.return_value = body
+        response.headers = {"ETag": '"v7"'}
+        response.__enter__.return_value = response
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            with mock.patch("urllib.request.urlopen", return_value=response):
+                self.assertTrue(db.download())
+            
+            self.assertTrue(db.get_rule("fresh.mod").load_top)
+            self.assertEqual(db.cache_file.read_bytes(), body)
+            self.assertEqual(json.loads(db.meta_file.read_text())["etag"], '"v7"')
+    
+    def test_download_unparsable_rules_not_cached(self):
+        """A response that fails to parse must not be written to the cache."""
+        from unittest import mock
+        from compatibility_db import CompatibilityDatabase
+        
+        body = b'{"rules": {"a.mod": {"loadBefore": 5}}}'
+        response = mock.MagicMock()
+        response.read.return_value = body
+        response.headers = {}
+        response.__enter__.return_value = response
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            with mock.patch("urllib.request.urlopen", return_value=response), \
+                    mock.patch("time.sleep"):
+                self.assertFalse(db.download())
+            
+            self.assertFalse(db.cache_file.exists())
+            self.assertFalse(db.is_cache_valid())
+    
+    def test_unparsable_cache_removed(self):
+        """Valid JSON with malformed rules should be treated as a corrupt cache."""
+        from compatibility_db import CompatibilityDatabase
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            db.cache_file.write_text(json.dumps({"rules": {"a.mod": {"loadBefore": 5}}}))
+            
+            self.assertFalse(db.load_from_cache())
+            self.assertFalse(db.cache_file.exists())
+    
+    def test_not_modified_reuses_cache(self):
+        """A 304 response should keep the cached rules without re-parsing."""
+        import urllib.error
+        from unittest import mock
+        from compatibility_db import CompatibilityDatabase
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = CompatibilityDatabase(Path(tmpdir))
+            db._save_cache(
+                json.dumps({"timestamp": 1, "rules": {"cached.mod": {}}}).encode(),
+                rule_count=1, etag='"abc"',
+            )
+            
+            fresh = CompatibilityDatabase(Path(tmpdir))
+            not_modified = urllib.error.HTTPError(
+                "https://example.invalid", 304, "Not Modified", {}, None
+            )
+            with mock.patch("urllib.request.urlopen", side_effect=not_modified) as urlopen:
+                self.assertTrue(fresh.download())
+            
+            request = urlopen.call_args[0][0]
+            self.assertEqual(request.get_header("If-none-match"), '"abc"')
+            self.assertIsNotNone(fresh.get_rule("cached.mod"))
+            self.assertTrue(fresh.is_cache_valid())
+
+
+class TestCompatibilityDBSortOrder(unittest.TestCase):
+    """Test community rules ordering helpers."""
+    
+    def setUp(self):
+        from compatibility_db import CompatibilityDatabase
+        
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.db = CompatibilityDatabase(Path(self._tmpdir.name))
+        self.db._db = self.db._parse_rules({
+            "timestamp": 1,
+            "rules": {
+                "Dependent.Mod": {"loadAfter": {"base.mod": {}}},
+                "early.mod": {"loadBefore": {"dependent.mod": {}}},
+                "top.mod": {"loadTop": {"value": True}},
+                "bottom.mod": {"loadBottom": {"value": True}},
+                "bad.mod": {"incompatibleWith": {"base.mod": {}}},
+            },
+        })
+    
+    def tearDown(self):
+        self._tmpdir.cleanup()
+    
+    def test_suggest_sort_order_respects_rules(self):
+        """Rules should be applied while keeping the original case."""
+        mods = ["bottom.mod", "Dependent.Mod", "Base.Mod", "top.mod", "early.mod"]
+        result = self.db.suggest_sort_order(mods)
+        
+        self.assertEqual(sorted(result), sorted(mods))
+        self.assertEqual(result[0], "top.mod")
+        self.assertEqual(result[-1], "bottom.mod")
+        self.assertLess(result.index("Base.Mod"), result.index("Dependent.Mod"))
+        self.assertLess(result.index("early.mod"), result.index("Dependent.Mod"))
+    
+    def test_suggest_sort_order_without_rules(self):
+        """Mods without any rules should keep their order."""
+        mods = ["Zeta.Mod", "alpha.mod", "Middle.Mod"]
+        result = self.db.suggest_sort_order(mods)
+        
+        self.assertEqual(result, mods)
+        self.assertIsNot(result, mods)
+    
+    def test_suggest_sort_order_handles_cycles(self):
+        """Mods in a rule cycle should still be returned."""
+        self.db._db = self.db._parse_rules({
+            "rules": {
+                "a.mod": {"loadAfter": {"b.mod": {}}},
+                "b.mod": {"loadAfter": {"a.mod": {}}},
+            },
+        })
+        with self.assertLogs("rimmodmanager.compatibility_db", level="WARNING") as logs:
+            result = self.db.suggest_sort_order(["a.mod", "b.mod", "c.mod"])
+        self.assertEqual(result, ["c.mod", "a.mod", "b.mod"])
+        self.assertIn("Cycle detected among 2 mods", logs.output[0])
+    
+    def test_load_order_issues(self):
+        """Should report order violations and incompatibilities."""
+        issues = self.db.get_load_order_issues(["Dependent.Mod", "base.mod", "bad.mod"])
+        kinds = {(i["type"], i["mod"], i["target"]) for i in issues}
+        
+        self.assertIn(("load_order", "Dependent.Mod", "base.mod"), kinds)
+        self.assertIn(("incompatible", "bad.mod", "base.mod"), kinds)
 
 
 class TestNetworkRetryLogic(unittest.TestCase):
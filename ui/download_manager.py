@@ -4,6 +4,7 @@ Provides real-time SteamCMD output and download progress.
 Supports parallel downloads for faster mod collection downloads.
 """
 
+import os
 import re
 import shutil
 import subprocess
@@ -27,6 +28,53 @@ from PyQt6.QtGui import QFont, QTextCursor, QColor
 
 log = logging.getLogger("rimmodmanager.download_manager")
 
+# SteamCMD output parsing, compiled once rather than per output line.
+# Output is read as bytes, so lines are only decoded when shown in the log.
+_BYTE_PROGRESS_RE = re.compile(rb'(\d+)\s*/\s*(\d+)')
+_DOWNLOADING_ITEM_RE = re.compile(rb'Downloading item (\d+)')
+_DOWNLOADED_ITEM_RE = re.compile(rb'Success.*Downloaded item (\d+)')
+_ANSI_RE = re.compile(rb'\x1b\[[0-9;]*m|\[0m')
+
+# Noisy/repetitive SteamCMD lines hidden from the batch log
+_BATCH_SKIP_PATTERNS = (
+    b"Redirecting stderr",
+    b"Logging directory",
+    b"UpdateUI: skip",
+    b"Steam Console Client",
+    b"type 'quit'",
+    b"[0m",  # ANSI codes
+    b"CProcessWorkItem",
+    b"Work Item",
+    b"d3ddriverquery",
+    b"ILocalize",
+    b"CAppInfoCacheReadFromDisk",
+)
+
+# Pipe read size for SteamCMD output
+_READ_CHUNK_SIZE = 65536
+
+# Name prefix of the per-run scratch folder inside the download folder
+_SCRATCH_PREFIX = ".rimmod_"
+
+
+def _iter_output_lines(stream):
+    """
+    Yield lines from a binary process pipe, reading it in large chunks.
+    Splits on LF, CR and CRLF like text mode did, since SteamCMD redraws
+    progress lines with carriage returns.
+    """
+    tail = b""
+    while True:
+        chunk = stream.read1(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        data = tail + chunk
+        lines = data.splitlines()
+        tail = lines.pop() if data[-1:] not in (b"\n", b"\r") else b""
+        yield from lines
+    if tail:
+        yield tail
+
 
 class DownloadStatus(Enum):
     PENDING = "Pending"
@@ -37,7 +85,7 @@ class DownloadStatus(Enum):
     CANCELLED = "Cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadItem:
     """A single download item."""
     workshop_id: str
@@ -50,6 +98,10 @@ class DownloadItem:
 class SteamCMDChecker:
     """Utility to check and help install SteamCMD - cross-platform."""
     
+    # Last path found by find_steamcmd(); misses are not cached so a fresh
+    # install is picked up on the next check
+    _cached_path: Optional[str] = None
+    
     @staticmethod
     def get_platform() -> str:
         """Get current platform."""
@@ -60,9 +112,22 @@ class SteamCMDChecker:
             return 'macos'
         return 'linux'
     
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forget the cached SteamCMD location so the next lookup probes again."""
+        cls._cached_path = None
+    
+    @classmethod
+    def find_steamcmd(cls) -> Optional[str]:
+        """Find SteamCMD executable - cross-platform. The result is cached."""
+        if cls._cached_path and os.path.exists(cls._cached_path):
+            return cls._cached_path
+        cls._cached_path = cls._probe_steamcmd()
+        return cls._cached_path
+    
     @staticmethod
-    def find_steamcmd() -> Optional[str]:
-        """Find SteamCMD executable - cross-platform."""
+    def _probe_steamcmd() -> Optional[str]:
+        """Search the usual SteamCMD install locations."""
         plat = SteamCMDChecker.get_platform()
         
         if plat == 'windows':
@@ -91,9 +156,12 @@ class SteamCMDChecker:
             ]
         
         for path in paths:
-            if shutil.which(path):
-                return path
-            if Path(path).exists():
+            # Only bare command names need a $PATH search
+            if "/" not in path and "\\" not in path:
+                found = shutil.which(path)
+                if found:
+                    return found
+            if os.path.exists(path):
                 return path
         return None
     
@@ -156,7 +224,7 @@ class LiveDownloadWorker(QThread):
     """
     
     # Signals
-    log_output = pyqtSignal(str)  # Real-time log line
+    log_output = pyqtSignal(str)  # Batch of log lines, newline-separated
     item_started = pyqtSignal(str)  # workshop_id
     item_progress = pyqtSignal(str, int)  # workshop_id, progress %
     item_complete = pyqtSignal(str, str, str)  # workshop_id, output_path, mod_name
@@ -165,6 +233,15 @@ class LiveDownloadWorker(QThread):
     
     RIMWORLD_APPID = "294100"
     
+    # Log batching: flush after this many lines or seconds, whichever comes first
+    LOG_BATCH_LINES = 32
+    LOG_BATCH_INTERVAL = 0.05
+    
+    # A live run refreshes its scratch folder's mtime every SCRATCH_HEARTBEAT
+    # seconds; one untouched for SCRATCH_STALE_AGE belongs to a run that died
+    SCRATCH_HEARTBEAT = 300
+    SCRATCH_STALE_AGE = 6 * 3600
+    
     def __init__(self, steamcmd_path: str, workshop_ids: list[str], download_path: Path,
                  download_mode: str = "parallel", max_parallel: int = 3, 
                  timeout_per_mod: int = 300, max_retries: int = 3):
@@ -180,6 +257,62 @@ class LiveDownloadWorker(QThread):
         self._process = None
         self._processes: list[subprocess.Popen] = []
         self._lock = threading.Lock()
+        self._scratch_dir: Optional[Path] = None  # Created per run()
+        
+        # Log lines are sent to the UI in batches to keep the event loop responsive
+        self._log_lock = threading.Lock()
+        self._pending_lines: list[str] = []
+        self._last_log_flush = time.monotonic()
+    
+    def _log(self, line: str):
+        """Queue a log line, sending the batch once it is big or old enough."""
+        with self._log_lock:
+            self._pending_lines.append(line)
+        self._maybe_flush_log()
+    
+    def _maybe_flush_log(self):
+        """Send queued log lines if the batch is full or has waited long enough."""
+        with self._log_lock:
+            if not self._pending_lines:
+                return
+            if (len(self._pending_lines) < self.LOG_BATCH_LINES
+                    and time.monotonic() - self._last_log_flush < self.LOG_BATCH_INTERVAL):
+                return
+            self._emit_pending_lines()
+    
+    def _flush_log_periodically(self, stop: threading.Event):
+        """
+        Flush queued lines every LOG_BATCH_INTERVAL, even while no output arrives.
+        Also keeps this run's scratch folder looking alive to other instances.
+        """
+        last_heartbeat = time.monotonic()
+        while not stop.wait(self.LOG_BATCH_INTERVAL):
+            self._maybe_flush_log()
+            if time.monotonic() - last_heartbeat >= self.SCRATCH_HEARTBEAT:
+                last_heartbeat = time.monotonic()
+                self._touch_scratch_dir()
+    
+    def _touch_scratch_dir(self):
+        """Refresh the scratch folder's mtime so it is not taken for stale."""
+        if self._scratch_dir is None:
+            return
+        try:
+            os.utime(self._scratch_dir)
+        except OSError:
+            pass  # Already removed, or not created yet
+    
+    def _flush_log(self):
+        """Send any queued log lines now."""
+        with self._log_lock:
+            if self._pending_lines:
+                self._emit_pending_lines()
+    
+    def _emit_pending_lines(self):
+        """Emit queued lines as one block. Caller must hold _log_lock."""
+        # Emitting under the lock keeps batches from different threads in order
+        self.log_output.emit("\n".join(self._pending_lines))
+        self._pending_lines = []
+        self._last_log_flush = time.monotonic()
     
     def cancel(self):
         """Cancel the download."""
@@ -199,13 +332,29 @@ class LiveDownloadWorker(QThread):
                     pass
     
     def run(self):
+        # Without this, a line queued just before SteamCMD goes quiet would
+        # sit unsent until the next line arrives, possibly minutes later
+        stop_flusher = threading.Event()
+        flusher = threading.Thread(
+            target=self._flush_log_periodically, args=(stop_flusher,), daemon=True
+        )
+        flusher.start()
+        try:
+            self._run()
+        finally:
+            stop_flusher.set()
+            flusher.join()
+            self._flush_log()
+    
+    def _run(self):
         success = 0
         failed = 0
         skipped = 0
         
         # Validate SteamCMD path before starting
         if not self.steamcmd_path or not Path(self.steamcmd_path).exists():
-            self.log_output.emit(f"[ERROR] SteamCMD not found at: {self.steamcmd_path}")
+            self._log(f"[ERROR] SteamCMD not found at: {self.steamcmd_path}")
+            self._flush_log()
             self.all_complete.emit(0, len(self.workshop_ids))
             return
         
@@ -217,43 +366,62 @@ class LiveDownloadWorker(QThread):
             test_file.touch()
             test_file.unlink()
         except OSError as e:
-            self.log_output.emit(f"[ERROR] Cannot write to download directory: {e}")
+            self._log(f"[ERROR] Cannot write to download directory: {e}")
+            self._flush_log()
             self.all_complete.emit(0, len(self.workshop_ids))
             return
         
+        # Partial downloads left behind by a crashed or killed run
+        self._remove_stale_scratch_dirs()
+        
         # Check which mods already exist
         ids_to_download = []
         for wid in self.workshop_ids:
             existing_path = self.download_path / wid
             if existing_path.exists() and self._is_valid_mod(existing_path):
                 mod_name = get_mod_name_from_path(existing_path)
-                self.log_output.emit(f"[SKIP] Mod {wid} already exists: {mod_name}")
+                self._log(f"[SKIP] Mod {wid} already exists: {mod_name}")
                 self.item_complete.emit(wid, str(existing_path), mod_name)
                 skipped += 1
             else:
                 ids_to_download.append(wid)
         
         if not ids_to_download:
-            self.log_output.emit(f"\n[INFO] All {len(self.workshop_ids)} mod(s) already downloaded!")
+            self._log(f"\n[INFO] All {len(self.workshop_ids)} mod(s) already downloaded!")
+            self._flush_log()
             self.all_complete.emit(skipped, 0)
             return
         
-        # Choose download mode
-        if self.download_mode == "parallel":
-            self.log_output.emit(f"\n[INFO] Starting PARALLEL download of {len(ids_to_download)} mod(s)")
-            self.log_output.emit(f"[INFO] Max {self.max_parallel} concurrent downloads, {self.timeout_per_mod}s timeout per mod")
-            if skipped > 0:
-                self.log_output.emit(f"[INFO] Skipped {skipped} already downloaded mod(s)")
-            self.log_output.emit("")
-            
-            results = self._download_parallel(ids_to_download)
-        else:
-            self.log_output.emit(f"\n[INFO] Starting BATCH download of {len(ids_to_download)} mod(s)")
-            if skipped > 0:
-                self.log_output.emit(f"[INFO] Skipped {skipped} already downloaded mod(s)")
-            self.log_output.emit("[INFO] Using single SteamCMD session\n")
-            
-            results = self._download_batch(ids_to_download)
+        # One scratch folder for the whole run. It lives inside the download
+        # folder so finished mods can be renamed into place, and is hidden so
+        # mod scans skip it.
+        try:
+            self._scratch_dir = Path(tempfile.mkdtemp(prefix=_SCRATCH_PREFIX, dir=self.download_path))
+        except OSError as e:
+            self._log(f"[ERROR] Cannot create scratch folder: {e}")
+            self._flush_log()
+            self.all_complete.emit(skipped, len(ids_to_download))
+            return
+        
+        try:
+            # Choose download mode
+            if self.download_mode == "parallel":
+                self._log(f"\n[INFO] Starting PARALLEL download of {len(ids_to_download)} mod(s)")
+                self._log(f"[INFO] Max {self.max_parallel} concurrent downloads, {self.timeout_per_mod}s timeout per mod")
+                if skipped > 0:
+                    self._log(f"[INFO] Skipped {skipped} already downloaded mod(s)")
+                self._log("")
+                
+                results = self._download_parallel(ids_to_download)
+            else:
+                self._log(f"\n[INFO] Starting BATCH download of {len(ids_to_download)} mod(s)")
+                if skipped > 0:
+                    self._log(f"[INFO] Skipped {skipped} already downloaded mod(s)")
+                self._log("[INFO] Using single SteamCMD session\n")
+                
+                results = self._download_batch(ids_to_download)
+        finally:
+            self._remove_scratch_dir()
         
         for wid, result_path in results.items():
             if result_path:
@@ -262,14 +430,59 @@ class LiveDownloadWorker(QThread):
                 # Only emit for batch mode - parallel mode emits in real-time
                 if self.download_mode != "parallel":
                     self.item_complete.emit(wid, str(result_path), mod_name)
-                self.log_output.emit(f"[SUCCESS] {mod_name} ({wid})")
+                self._log(f"[SUCCESS] {mod_name} ({wid})")
             else:
                 failed += 1
                 if self.download_mode != "parallel":
                     self.item_failed.emit(wid, "Download failed")
         
+        self._flush_log()
         self.all_complete.emit(success + skipped, failed)
     
+    def _remove_stale_scratch_dirs(self):
+        """
+        Delete scratch folders from earlier runs that never cleaned up.
+        
+        Only folders untouched for SCRATCH_STALE_AGE are removed, since another
+        instance may be downloading into the same folder right now.
+        """
+        cutoff = time.time() - self.SCRATCH_STALE_AGE
+        try:
+            with os.scandir(self.download_path) as it:
+                stale = [
+                    entry.path for entry in it
+                    if entry.name.startswith(_SCRATCH_PREFIX) and entry.is_dir(follow_symlinks=False)
+                    and Path(entry.path) != self._scratch_dir
+                    and entry.stat(follow_symlinks=False).st_mtime < cutoff
+                ]
+        except OSError:
+            return
+        for path in stale:
+            log.debug(f"Removing stale scratch path {path}")
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def _remove_scratch_dir(self):
+        """Delete the run's scratch folder, retrying briefly if files are still locked."""
+        for attempt in range(3):
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            if not self._scratch_dir.exists():
+                return
+            time.sleep(0.5)  # Wait a bit and retry
+        log.debug(f"Failed cleaning scratch path {self._scratch_dir}")
+    
+    def _move_into_place(self, workshop_content: Path, workshop_id: str) -> Path:
+        """Move a downloaded mod from the scratch folder to the download folder."""
+        final_path = self.download_path / workshop_id
+        if final_path.exists():
+            shutil.rmtree(final_path, ignore_errors=True)
+        
+        try:
+            # Same filesystem in the normal case, so this is a cheap rename
+            os.rename(workshop_content, final_path)
+        except OSError:
+            shutil.move(str(workshop_content), str(final_path))
+        return final_path
+    
     def _is_valid_mod(self, mod_path: Path) -> bool:
         """Check if a mod folder is valid (has About.xml)."""
         about_xml = mod_path / "About" / "About.xml"
@@ -279,13 +492,20 @@ class LiveDownloadWorker(QThread):
         return about_xml_lower.exists()
     
     def _download_parallel(self, workshop_ids: list[str]) -> dict[str, Optional[Path]]:
-        """Download mods using multiple parallel SteamCMD processes."""
+        """
+        Download mods using multiple parallel SteamCMD processes.
+        
+        Mods are split across at most max_parallel processes, each of which
+        logs in once and downloads its whole share. Mods that fail are then
+        retried one per process.
+        """
         results = {wid: None for wid in workshop_ids}
+        workers = max(1, min(self.max_parallel, len(workshop_ids)))
         
-        self.log_output.emit(f"{'='*50}")
-        self.log_output.emit(f"[PARALLEL] Downloading {len(workshop_ids)} mods")
-        self.log_output.emit(f"[INFO] Using {self.max_parallel} parallel workers")
-        self.log_output.emit(f"{'='*50}\n")
+        self._log(f"{'='*50}")
+        self._log(f"[PARALLEL] Downloading {len(workshop_ids)} mods")
+        self._log(f"[INFO] Using {workers} parallel workers")
+        self._log(f"{'='*50}\n")
         
         # Mark all as started
         for wid in workshop_ids:
@@ -294,336 +514,342 @@ class LiveDownloadWorker(QThread):
         completed_count = [0]  # Use list for mutable in closure
         total_mods = len(workshop_ids)
         
-        def download_single(wid: str) -> tuple[str, Optional[Path]]:
-            """Download a single mod with retries."""
+        def on_complete(wid: str, result: Path) -> None:
+            """Report a finished mod as soon as it has been moved into place."""
+            with self._lock:
+                completed_count[0] += 1
+                count = completed_count[0]
+            self._log(f"[OK {count}/{total_mods}] Mod {wid} downloaded")
+            # Emit item_complete signal for real-time progress update
+            mod_name = get_mod_name_from_path(result)
+            self.item_complete.emit(wid, str(result), mod_name)
+        
+        def download_group(index: int, group: list[str]) -> dict[str, Optional[Path]]:
+            """First attempt: one SteamCMD session for a share of the mods."""
             if self._cancelled:
-                return wid, None
-            
-            for attempt in range(self.max_retries):
+                return {}
+            return self._download_group(group, self._scratch_dir / f"worker{index}", on_complete)
+        
+        def retry_single(wid: str) -> tuple[str, Optional[Path]]:
+            """Retry a mod that failed in its group, one process per attempt."""
+            for attempt in range(1, self.max_retries):
                 if self._cancelled:
                     return wid, None
                 
-                if attempt > 0:
-                    self.log_output.emit(f"[RETRY {attempt}/{self.max_retries}] Mod {wid}")
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                self._log(f"[RETRY {attempt}/{self.max_retries}] Mod {wid}")
+                time.sleep(2 ** attempt)  # Exponential backoff
                 
-                result = self._download_single_mod(wid)
+                # Reusing the folder lets SteamCMD resume partial downloads
+                install_dir = self._scratch_dir / f"retry_{wid}"
+                result = self._download_group([wid], install_dir, on_complete).get(wid)
                 if result:
-                    with self._lock:
-                        completed_count[0] += 1
-                        count = completed_count[0]
-                    self.log_output.emit(f"[OK {count}/{total_mods}] Mod {wid} downloaded")
-                    # Emit item_complete signal for real-time progress update
-                    mod_name = get_mod_name_from_path(result)
-                    self.item_complete.emit(wid, str(result), mod_name)
                     return wid, result
             
-            self.log_output.emit(f"[FAILED] Mod {wid} after {self.max_retries} attempts")
+            self._log(f"[FAILED] Mod {wid} after {self.max_retries} attempts")
             self.item_failed.emit(wid, f"Failed after {self.max_retries} attempts")
             return wid, None
         
+        groups = [workshop_ids[i::workers] for i in range(workers)]
+        
         # Use ThreadPoolExecutor for parallel downloads
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
-            future_to_wid = {executor.submit(download_single, wid): wid for wid in workshop_ids}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_group = {
+                executor.submit(download_group, i, group): group for i, group in enumerate(groups)
+            }
             
-            for future in concurrent.futures.as_completed(future_to_wid):
+            for future in concurrent.futures.as_completed(future_to_group):
                 if self._cancelled:
                     executor.shutdown(wait=False, cancel_futures=True)
                     break
                 
                 try:
-                    wid, result_path = future.result()
-                    results[wid] = result_path
+                    results.update(future.result())
                 except (OSError, ValueError, RuntimeError, concurrent.futures.CancelledError) as e:
-                    wid = future_to_wid[future]
-                    self.log_output.emit(f"[ERROR] Mod {wid}: {e}")
-                    self.item_failed.emit(wid, str(e))
-                    results[wid] = None
+                    self._log(f"[ERROR] {e}")
+            
+            failed = [wid for wid in workshop_ids if results[wid] is None]
+            if failed and not self._cancelled:
+                future_to_wid = {executor.submit(retry_single, wid): wid for wid in failed}
+                
+                for future in concurrent.futures.as_completed(future_to_wid):
+                    if self._cancelled:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    
+                    try:
+                        wid, result_path = future.result()
+                        results[wid] = result_path
+                    except (OSError, ValueError, RuntimeError, concurrent.futures.CancelledError) as e:
+                        wid = future_to_wid[future]
+                        self._log(f"[ERROR] Mod {wid}: {e}")
+                        self.item_failed.emit(wid, str(e))
+                        results[wid] = None
         
         return results
     
-    def _download_single_mod(self, workshop_id: str) -> Optional[Path]:
-        """Download a single mod in its own SteamCMD process."""
-        temp_path = Path(tempfile.mkdtemp(prefix=f"rimmod_{workshop_id}_"))
+    def _download_group(self, workshop_ids: list[str], install_dir: Path,
+                        on_complete=None) -> dict[str, Optional[Path]]:
+        """
+        Download a group of mods in one SteamCMD process, installing into install_dir.
+        
+        Each mod is moved to the download folder as soon as SteamCMD reports it
+        finished, and on_complete(workshop_id, path) is called for it.
+        The caller owns install_dir; no other process may use it concurrently.
+        """
+        results: dict[str, Optional[Path]] = {wid: None for wid in workshop_ids}
+        content_base = install_dir / "steamapps/workshop/content" / self.RIMWORLD_APPID
+        
+        def finish(wid: str) -> None:
+            """Move a downloaded mod to its final location."""
+            workshop_content = content_base / wid
+            if wid not in results or results[wid] is not None or not workshop_content.exists():
+                return
+            
+            self.item_progress.emit(wid, 95)
+            final_path = self._move_into_place(workshop_content, wid)
+            self.item_progress.emit(wid, 100)
+            results[wid] = final_path
+            if on_complete:
+                on_complete(wid, final_path)
         
         try:
-            self.item_progress.emit(workshop_id, 5)
+            for wid in workshop_ids:
+                self.item_progress.emit(wid, 5)
             
+            install_dir.mkdir(parents=True, exist_ok=True)
             cmd = [
                 self.steamcmd_path,
-                "+force_install_dir", str(temp_path),
+                "+force_install_dir", str(install_dir),
                 "+login", "anonymous",
-                "+workshop_download_item", self.RIMWORLD_APPID, workshop_id,
-                "+quit"
             ]
+            for wid in workshop_ids:
+                cmd.extend(["+workshop_download_item", self.RIMWORLD_APPID, wid])
+            cmd.append("+quit")
             
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
+                bufsize=_READ_CHUNK_SIZE
             )
             
             # Track process for cancellation
             with self._lock:
                 self._processes.append(process)
             
-            self.item_progress.emit(workshop_id, 10)
+            for wid in workshop_ids:
+                self.item_progress.emit(wid, 10)
             
             # Read output with timeout
             start_time = time.time()
+            timeout = self.timeout_per_mod * len(workshop_ids)
+            current_wid = workshop_ids[0] if len(workshop_ids) == 1 else None
+            timed_out = False
             
             try:
-                while True:
+                for line in _iter_output_lines(process.stdout):
+                    self._maybe_flush_log()
+                    
                     if self._cancelled:
                         process.terminate()
-                        return None
+                        return results
                     
                     # Check timeout
-                    if time.time() - start_time > self.timeout_per_mod:
-                        self.log_output.emit(f"[TIMEOUT] Mod {workshop_id} exceeded {self.timeout_per_mod}s")
+                    if time.time() - start_time > timeout:
+                        self._log(f"[TIMEOUT] Mod(s) {', '.join(workshop_ids)} exceeded {timeout}s")
                         process.terminate()
-                        return None
+                        timed_out = True
+                        break
                     
-                    # Non-blocking read with timeout
                     try:
-                        line = process.stdout.readline()
-                        if not line and process.poll() is not None:
-                            break
-                        
-                        if line:
-                            line = line.strip()
-                            # Parse progress
-                            if "Downloading item" in line:
-                                self.item_progress.emit(workshop_id, 20)
-                            elif "Success" in line and "Downloaded item" in line:
-                                self.item_progress.emit(workshop_id, 90)
-                            # Parse byte progress
-                            progress_match = re.search(r'(\d+)\s*/\s*(\d+)', line)
-                            if progress_match:
-                                downloaded = int(progress_match.group(1))
-                                total = int(progress_match.group(2))
-                                if total > 0:
-                                    pct = min(85, 20 + int(downloaded * 65 / total))
-                                    self.item_progress.emit(workshop_id, pct)
-                    except (OSError, ValueError, AttributeError):
+                        # Parse progress
+                        download_match = _DOWNLOADING_ITEM_RE.search(line)
+                        if download_match:
+                            current_wid = download_match.group(1).decode()
+                            self.item_progress.emit(current_wid, 20)
+                            continue
+                        success_match = _DOWNLOADED_ITEM_RE.search(line)
+                        if success_match:
+                            wid = success_match.group(1).decode()
+                            self.item_progress.emit(wid, 90)
+                            finish(wid)
+                            continue
+                        # Parse byte progress
+                        progress_match = _BYTE_PROGRESS_RE.search(line)
+                        if progress_match and current_wid:
+                            downloaded = int(progress_match.group(1))
+                            total = int(progress_match.group(2))
+                            if total > 0:
+                                pct = min(85, 20 + int(downloaded * 65 / total))
+                                self.item_progress.emit(current_wid, pct)
+                    except (OSError, ValueError):
                         continue
                 
                 process.wait(timeout=10)
                 
             except subprocess.TimeoutExpired:
                 process.terminate()
-                return None
+                timed_out = True
             finally:
                 with self._lock:
                     if process in self._processes:
                         self._processes.remove(process)
             
-            # Move to final location
-            workshop_content = temp_path / "steamapps/workshop/content" / self.RIMWORLD_APPID / workshop_id
-            
-            if workshop_content.exists():
-                self.item_progress.emit(workshop_id, 95)
-                final_path = self.download_path / workshop_id
-                
-                if final_path.exists():
-                    shutil.rmtree(final_path, ignore_errors=True)
-                
-                shutil.move(str(workshop_content), str(final_path))
-                self.item_progress.emit(workshop_id, 100)
-                return final_path
+            # Pick up anything whose success line was missed. Only trust the
+            # content folder when SteamCMD exited on its own; after a timeout
+            # it may be partial, so those mods go through the retry path.
+            if not timed_out:
+                for wid in workshop_ids:
+                    finish(wid)
             
-            return None
+            return results
             
         except (OSError, IOError, subprocess.SubprocessError, ValueError, RuntimeError) as e:
-            self.log_output.emit(f"[ERROR] Mod {workshop_id}: {e}")
-            return None
-        finally:
-            # Cleanup temp directory
-            try:
-                if temp_path.exists():
-                    shutil.rmtree(temp_path, ignore_errors=True)
-            except (OSError, PermissionError):
-                log.debug(f"Failed cleaning temp path {temp_path}")
+            self._log(f"[ERROR] Mod(s) {', '.join(workshop_ids)}: {e}")
+            return results
     
     def _download_batch(self, workshop_ids: list[str]) -> dict[str, Optional[Path]]:
         """Download multiple mods in a single SteamCMD session."""
         results = {wid: None for wid in workshop_ids}
+        install_dir = self._scratch_dir
+        
+        # Build batch command - login once, download all
+        cmd = [
+            self.steamcmd_path,
+            "+force_install_dir", str(install_dir),
+            "+login", "anonymous",
+        ]
+        
+        # Add all workshop items to download
+        for wid in workshop_ids:
+            cmd.extend(["+workshop_download_item", self.RIMWORLD_APPID, wid])
+            self.item_started.emit(wid)
         
-        # Create temp directory manually so we can handle cleanup ourselves
-        temp_path = Path(tempfile.mkdtemp(prefix="rimmod_"))
+        cmd.append("+quit")
+        
+        self._log(f"{'='*50}")
+        self._log(f"[BATCH] Downloading {len(workshop_ids)} mods in single session")
+        self._log("[INFO] This may take a while for large collections...")
+        self._log(f"{'='*50}\n")
         
         try:
-            # Build batch command - login once, download all
-            cmd = [
-                self.steamcmd_path,
-                "+force_install_dir", str(temp_path),
-                "+login", "anonymous",
-            ]
-            
-            # Add all workshop items to download
-            for wid in workshop_ids:
-                cmd.extend(["+workshop_download_item", self.RIMWORLD_APPID, wid])
-                self.item_started.emit(wid)
-            
-            cmd.append("+quit")
+            self._process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=_READ_CHUNK_SIZE
+            )
             
-            self.log_output.emit(f"{'='*50}")
-            self.log_output.emit(f"[BATCH] Downloading {len(workshop_ids)} mods in single session")
-            self.log_output.emit("[INFO] This may take a while for large collections...")
-            self.log_output.emit(f"{'='*50}\n")
+            current_wid = None
+            logged_in = False
+            download_count = 0
+            total_mods = len(workshop_ids)
             
-            try:
-                self._process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                current_wid = None
-                logged_in = False
-                download_count = 0
-                total_mods = len(workshop_ids)
+            # Stream output with filtering
+            if self._process.stdout:
+                for line in _iter_output_lines(self._process.stdout):
+                    self._maybe_flush_log()
+                    line = line.rstrip()
+                    if not line:
+                        continue
                 
-                # Stream output with filtering
-                if self._process.stdout:
-                    for line in self._process.stdout:
-                        line = line.rstrip()
-                        if not line:
-                            continue
-                    
-                        # Filter out noisy/repetitive lines
-                        skip_patterns = [
-                            "Redirecting stderr",
-                            "Logging directory",
-                            "UpdateUI: skip",
-                            "Steam Console Client",
-                            "type 'quit'",
-                            "[0m",  # ANSI codes
-                            "CProcessWorkItem",
-                            "Work Item",
-                            "d3ddriverquery",
-                            "ILocalize",
-                            "CAppInfoCacheReadFromDisk",
-                        ]
-                    
-                        should_skip = any(p in line for p in skip_patterns)
-                    
-                        # Clean ANSI codes
-                        clean_line = re.sub(r'\x1b\[[0-9;]*m', '', line).strip()
-                        clean_line = re.sub(r'\[0m', '', clean_line).strip()
-                    
-                        if not clean_line or should_skip:
-                            continue
-                    
-                        # Detect login success (only show once)
-                        if "Connecting anonymously" in clean_line and not logged_in:
-                            self.log_output.emit("[SESSION] Connecting to Steam...")
-                            continue
-                        elif "Waiting for user info" in clean_line and not logged_in:
-                            logged_in = True
-                            self.log_output.emit("[SESSION] Connected to Steam (session will be reused)")
-                            continue
-                        elif logged_in and ("Connecting anonymously" in clean_line or "Waiting for" in clean_line):
-                            # Skip repeated connection messages
-                            continue
-                        
-                        # Detect "Checking for available updates" - this means download is starting
-                        if "Checking for available update" in clean_line:
-                            self.log_output.emit(f"[INFO] Checking Workshop items... ({download_count}/{total_mods})")
-                            continue
-                    
-                        # Detect which mod is being downloaded
-                        download_match = re.search(r'Downloading item (\d+)', clean_line)
-                        if download_match:
-                            current_wid = download_match.group(1)
-                            download_count += 1
-                            self.log_output.emit(f"\n[DOWNLOAD {download_count}/{total_mods}] Mod {current_wid}...")
-                            self.item_progress.emit(current_wid, 10)
-                            continue
-                    
-                        # Detect success
-                        success_match = re.search(r'Success.*Downloaded item (\d+)', clean_line)
-                        if success_match:
-                            wid = success_match.group(1)
-                            self.item_progress.emit(wid, 100)
-                            self.log_output.emit(f"[OK] Mod {wid} downloaded")
-                            continue
-                        
-                        # Detect download progress (bytes)
-                        progress_match = re.search(r'(\d+)\s*/\s*(\d+)', clean_line)
-                        if progress_match and current_wid:
-                            downloaded = int(progress_match.group(1))
-                            total = int(progress_match.group(2))
-                            if total > 0:
-                                pct = min(99, int(downloaded * 100 / total))
-                                self.item_progress.emit(current_wid, pct)
-                                # Only show progress every 10%
-                                if pct % 20 == 0:
-                                    self.log_output.emit(f"  Progress: {pct}%")
-                            continue
-                    
-                        # Show other relevant output
-                        if "Loading Steam API" in clean_line:
-                            self.log_output.emit("[SESSION] Loading Steam API...")
-                        elif "Unloading Steam API" in clean_line:
-                            self.log_output.emit("[SESSION] Finishing up...")
-                        elif "ERROR" in clean_line.upper() or "FAILED" in clean_line.upper():
-                            self.log_output.emit(f"[ERROR] {clean_line}")
-                        elif "%" in clean_line:
-                            # Progress percentage
-                            self.log_output.emit(f"  {clean_line}")
-                        elif "workshop" in clean_line.lower() and ("download" in clean_line.lower() or "item" in clean_line.lower()):
-                            # Other workshop-related messages
-                            self.log_output.emit(f"[INFO] {clean_line}")
-                    
-                        if self._cancelled:
-                            self._process.terminate()
-                            return results
+                    # Filter out noisy/repetitive lines
+                    if any(p in line for p in _BATCH_SKIP_PATTERNS):
+                        continue
                 
-                self._process.wait()
+                    # Clean ANSI codes
+                    raw_line = _ANSI_RE.sub(b'', line).strip()
                 
-                if self._process.returncode != 0:
-                    self.log_output.emit(f"\n[WARNING] SteamCMD exited with code {self._process.returncode}")
+                    if not raw_line:
+                        continue
                 
-                # Move downloaded mods to final location
-                self.log_output.emit(f"\n[INFO] Moving mods to {self.download_path}...")
+                    # Detect login success (only show once)
+                    if b"Connecting anonymously" in raw_line and not logged_in:
+                        self._log("[SESSION] Connecting to Steam...")
+                        continue
+                    elif b"Waiting for user info" in raw_line and not logged_in:
+                        logged_in = True
+                        self._log("[SESSION] Connected to Steam (session will be reused)")
+                        continue
+                    elif logged_in and (b"Connecting anonymously" in raw_line or b"Waiting for" in raw_line):
+                        # Skip repeated connection messages
+                        continue
+                    
+                    # Detect "Checking for available updates" - this means download is starting
+                    if b"Checking for available update" in raw_line:
+                        self._log(f"[INFO] Checking Workshop items... ({download_count}/{total_mods})")
+                        continue
                 
-                workshop_content_base = temp_path / "steamapps/workshop/content" / self.RIMWORLD_APPID
+                    # Detect which mod is being downloaded
+                    download_match = _DOWNLOADING_ITEM_RE.search(raw_line)
+                    if download_match:
+                        current_wid = download_match.group(1).decode()
+                        download_count += 1
+                        self._log(f"\n[DOWNLOAD {download_count}/{total_mods}] Mod {current_wid}...")
+                        self.item_progress.emit(current_wid, 10)
+                        continue
                 
-                for wid in workshop_ids:
-                    workshop_content = workshop_content_base / wid
+                    # Detect success
+                    success_match = _DOWNLOADED_ITEM_RE.search(raw_line)
+                    if success_match:
+                        wid = success_match.group(1).decode()
+                        self.item_progress.emit(wid, 100)
+                        self._log(f"[OK] Mod {wid} downloaded")
+                        continue
                     
-                    if workshop_content.exists():
-                        final_path = self.download_path / wid
-                        if final_path.exists():
-                            shutil.rmtree(final_path)
-                        
-                        shutil.move(str(workshop_content), str(final_path))
-                        results[wid] = final_path
-                    else:
-                        self.log_output.emit(f"[WARNING] Mod {wid} folder not found after download")
+                    # Detect download progress (bytes)
+                    progress_match = _BYTE_PROGRESS_RE.search(raw_line)
+                    if progress_match and current_wid:
+                        downloaded = int(progress_match.group(1))
+                        total = int(progress_match.group(2))
+                        if total > 0:
+                            pct = min(99, int(downloaded * 100 / total))
+                            self.item_progress.emit(current_wid, pct)
+                            # Only show progress every 10%
+                            if pct % 20 == 0:
+                                self._log(f"  Progress: {pct}%")
+                        continue
                 
-            except (OSError, IOError, subprocess.SubprocessError) as e:
-                self.log_output.emit(f"[EXCEPTION] {e}")
-        
-        finally:
-            # Clean up temp directory manually with retry
-            try:
-                import time
-                for attempt in range(3):
-                    try:
-                        if temp_path.exists():
-                            shutil.rmtree(temp_path, ignore_errors=True)
-                        break
-                    except (OSError, PermissionError):
-                        time.sleep(0.5)  # Wait a bit and retry
-            except (OSError, PermissionError) as e:
-                log.debug(f"Failed cleaning batch temp path {temp_path}: {e}")
+                    # Show other relevant output
+                    clean_line = raw_line.decode('utf-8', errors='replace')
+                    lower_line = clean_line.lower()
+                    if "Loading Steam API" in clean_line:
+                        self._log("[SESSION] Loading Steam API...")
+                    elif "Unloading Steam API" in clean_line:
+                        self._log("[SESSION] Finishing up...")
+                    elif "error" in lower_line or "failed" in lower_line:
+                        self._log(f"[ERROR] {clean_line}")
+                    elif "%" in clean_line:
+                        # Progress percentage
+                        self._log(f"  {clean_line}")
+                    elif "workshop" in lower_line and ("download" in lower_line or "item" in lower_line):
+                        # Other workshop-related messages
+                        self._log(f"[INFO] {clean_line}")
+                
+                    if self._cancelled:
+                        self._process.terminate()
+                        return results
+            
+            self._process.wait()
+            
+            if self._process.returncode != 0:
+                self._log(f"\n[WARNING] SteamCMD exited with code {self._process.returncode}")
+            
+            # Move downloaded mods to final location
+            self._log(f"\n[INFO] Moving mods to {self.download_path}...")
+            
+            workshop_content_base = install_dir / "steamapps/workshop/content" / self.RIMWORLD_APPID
+            
+            for wid in workshop_ids:
+                workshop_content = workshop_content_base / wid
+                
+                if workshop_content.exists():
+                    results[wid] = self._move_into_place(workshop_content, wid)
+                else:
+                    self._log(f"[WARNING] Mod {wid} folder not found after download")
+            
+        except (OSError, IOError, subprocess.SubprocessError) as e:
+            self._log(f"[EXCEPTION] {e}")
         
         return results
 
@@ -641,6 +867,7 @@ class DownloadLogWidget(QWidget):
         self._setup_ui()
         self._worker: Optional[LiveDownloadWorker] = None
         self._items: dict[str, DownloadItem] = {}
+        self._wid_to_item: dict[str, QListWidgetItem] = {}  # workshop_id -> queue row
         self._download_path: Optional[Path] = None
     
     def _setup_ui(self):
@@ -754,6 +981,7 @@ class DownloadLogWidget(QWidget):
         # Clear previous state
         self.queue_list.clear()
         self._items.clear()
+        self._wid_to_item.clear()
         self.log_text.clear()
         
         # Get download settings
@@ -790,6 +1018,7 @@ class DownloadLogWidget(QWidget):
             
             list_item.setData(Qt.ItemDataRole.UserRole, wid)
             self.queue_list.addItem(list_item)
+            self._wid_to_item[wid] = list_item
         
         # Setup progress
         self.progress_bar.setVisible(True)
@@ -878,23 +1107,41 @@ class DownloadLogWidget(QWidget):
         self._log_info(f"Could not fetch mod names after {max_retries} attempts")
         return names
     
-    def _on_log(self, line: str):
-        """Handle log output."""
-        # Color code the output
+    @staticmethod
+    def _log_color(line: str) -> str:
+        """Pick the display color for a log line."""
         if "[ERROR]" in line or "[EXCEPTION]" in line or "[FAILED]" in line or "[WARNING]" in line or "[TIMEOUT]" in line:
-            self.log_text.setTextColor(QColor("#ff6b6b"))
+            return "#ff6b6b"
         elif "[SUCCESS]" in line or "[OK" in line:
-            self.log_text.setTextColor(QColor("#69db7c"))
+            return "#69db7c"
         elif "[SESSION]" in line or "[BATCH]" in line or "[INFO]" in line or "[PARALLEL]" in line:
-            self.log_text.setTextColor(QColor("#74c0fc"))
+            return "#74c0fc"
         elif "[DOWNLOAD]" in line or "[RETRY" in line:
-            self.log_text.setTextColor(QColor("#ffd43b"))
+            return "#ffd43b"
         elif line.startswith("="):
-            self.log_text.setTextColor(QColor("#ffd43b"))
-        else:
-            self.log_text.setTextColor(QColor("#d4d4d4"))
-        
-        self.log_text.append(line)
+            return "#ffd43b"
+        return "#d4d4d4"
+    
+    def _on_log(self, block: str):
+        """Handle a batch of log output lines."""
+        # Append runs of same-colored lines together, repainting once per batch
+        self.log_text.setUpdatesEnabled(False)
+        try:
+            run: list[str] = []
+            run_color = None
+            for line in block.split("\n"):
+                color = self._log_color(line)
+                if run and color != run_color:
+                    self.log_text.setTextColor(QColor(run_color))
+                    self.log_text.append("\n".join(run))
+                    run = []
+                run.append(line)
+                run_color = color
+            if run:
+                self.log_text.setTextColor(QColor(run_color))
+                self.log_text.append("\n".join(run))
+        finally:
+            self.log_text.setUpdatesEnabled(True)
         
         # Auto-scroll
         self.log_text.moveCursor(QTextCursor.MoveOperation.End)
@@ -948,11 +1195,9 @@ class DownloadLogWidget(QWidget):
     
     def _update_queue_item(self, workshop_id: str, icon: str, status: str):
         """Update a queue item's display."""
-        for i in range(self.queue_list.count()):
-            item = self.queue_list.item(i)
-            if item.data(Qt.ItemDataRole.UserRole) == workshop_id:
-                item.setText(f"{icon} {status}")
-                break
+        item = self._wid_to_item.get(workshop_id)
+        if item is not None:
+            item.setText(f"{icon} {status}")
     
     def _cancel_downloads(self):
         """Cancel current downloads."""
@@ -1032,6 +1277,7 @@ class SteamCMDSetupWidget(QWidget):
     
     def _check_steamcmd(self):
         """Check if SteamCMD is now available."""
+        SteamCMDChecker.invalidate()
         if SteamCMDChecker.is_available():
             self.setup_complete.emit()
         else: